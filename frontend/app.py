@@ -1,11 +1,37 @@
+import gzip
+import hashlib
+import io
+import time
+
 import streamlit as st
 import pandas as pd
 import requests
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # ==================================================
 # CONFIG
 # ==================================================
-BACKEND_URL = "http://localhost:8000/analyze"
+BACKEND_BASE_URL = "http://localhost:8000"
+DATASETS_URL = f"{BACKEND_BASE_URL}/datasets"
+SESSIONS_URL = f"{BACKEND_BASE_URL}/sessions"
+JOBS_URL = f"{BACKEND_BASE_URL}/jobs"
+JOB_POLL_SECONDS = 1
+JOB_TIMEOUT_SECONDS = 600
+
+# Upload formats, recognised by their leading bytes (as the backend does)
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+PARQUET_MAGIC = b"PAR1"
+ARROW_MAGICS = (b"ARROW1", b"\xff\xff\xff\xff")
+HASH_CHUNK_BYTES = 1 << 20
+
+# History keeps a bounded slice per query; full results stay on the server
+HISTORY_RESULT_ROWS = 10
+MAX_HISTORY = 20
 
 st.set_page_config(
     page_title="AI Data Analyst Agent",
@@ -51,6 +77,165 @@ div[data-testid="stAlert"] {
 if "history" not in st.session_state:
     st.session_state.history = []
 
+if "file_hashes" not in st.session_state:
+    st.session_state.file_hashes = {}
+
+# Backend conversation per dataset, so follow-ups refine the last answer
+if "analysis_sessions" not in st.session_state:
+    st.session_state.analysis_sessions = {}
+
+
+# ==================================================
+# LOCAL FILE HELPERS (the frontend does not import the backend package)
+# ==================================================
+def open_decompressed(data: bytes):
+    # Readable stream of the content; None for zstd without 'zstandard'
+    if data.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=io.BytesIO(data))
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            return None
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+    return io.BytesIO(data)
+
+
+def content_hash(data: bytes):
+    # Same id as the backend: sha256 of the decompressed content
+    stream = open_decompressed(data)
+    if stream is None:
+        return None
+
+    digest = hashlib.sha256()
+    with stream:
+        while chunk := stream.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_preview_frame(data: bytes) -> pd.DataFrame:
+    stream = open_decompressed(data)
+    if stream is None:
+        raise ValueError("previewing zstd files needs the 'zstandard' package")
+    with stream:
+        content = stream.read()
+
+    # Parquet / Arrow need pyarrow here; the backend parses them either way
+    if content.startswith(PARQUET_MAGIC):
+        return pd.read_parquet(io.BytesIO(content))
+    if content.startswith(ARROW_MAGICS):
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        open_ipc = pa.ipc.open_file if content.startswith(b"ARROW1") else pa.ipc.open_stream
+        return open_ipc(pa.BufferReader(content)).read_all().to_pandas()
+
+    try:
+        return pd.read_csv(io.BytesIO(content), encoding="utf-8")
+    except UnicodeDecodeError:
+        return pd.read_csv(io.BytesIO(content), encoding="latin1")
+
+
+# ==================================================
+# CONTENT-ADDRESSED UPLOADS
+# ==================================================
+def file_key(uploaded_file) -> str:
+    return getattr(uploaded_file, "file_id", None) or uploaded_file.name
+
+
+def get_file_hash(uploaded_file):
+    # None until the backend names it when the file cannot be hashed here
+    file_id = file_key(uploaded_file)
+    if file_id not in st.session_state.file_hashes:
+        st.session_state.file_hashes = {
+            file_id: content_hash(uploaded_file.getvalue())
+        }
+    return st.session_state.file_hashes[file_id]
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_preview(content_key: str, _data: bytes):
+    # Keyed by content so re-uploads hit the cache; only the preview slice and shape are kept
+    df = read_preview_frame(_data)
+    return df.head(20), df.shape
+
+
+def upload_payload(data: bytes) -> bytes:
+    # Plain CSV is gzipped before upload; compressed and binary formats go as-is
+    binary = (GZIP_MAGIC, ZSTD_MAGIC, PARQUET_MAGIC) + ARROW_MAGICS
+    if not data.startswith(binary):
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+def ensure_dataset_uploaded(file_hash, uploaded_file) -> str:
+    """
+    Upload the file only when the backend does not hold this hash yet.
+    Returns the dataset_id, which the backend assigns when file_hash is None.
+    """
+    if file_hash is not None:
+        status = requests.get(f"{DATASETS_URL}/{file_hash}", timeout=30)
+        if status.status_code == 200:
+            return file_hash
+
+    response = requests.post(
+        DATASETS_URL,
+        files={
+            "file": (
+                uploaded_file.name,
+                upload_payload(uploaded_file.getvalue()),
+                "application/octet-stream"
+            )
+        },
+        timeout=300
+    )
+    response.raise_for_status()
+
+    dataset_id = response.json()["dataset_id"]
+    st.session_state.file_hashes[file_key(uploaded_file)] = dataset_id
+    return dataset_id
+
+
+def ensure_session(file_hash: str) -> str:
+    session_id = st.session_state.analysis_sessions.get(file_hash)
+    if session_id is None:
+        response = requests.post(SESSIONS_URL, data={"dataset_id": file_hash}, timeout=30)
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+        st.session_state.analysis_sessions[file_hash] = session_id
+    return session_id
+
+
+def submit_job(file_hash: str, question: str):
+    return requests.post(
+        JOBS_URL,
+        data={
+            "question": question,
+            "session_id": ensure_session(file_hash),
+            "priority": "interactive"
+        },
+        timeout=300
+    )
+
+
+def wait_for_job(job_id: str) -> dict:
+    # Problems come back as a failed job, which the caller already reports
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        response = requests.get(f"{JOBS_URL}/{job_id}", timeout=30)
+        if response.status_code != 200:
+            return {"status": "failed", "error": f"{response.status_code}: {response.text}"}
+
+        job = response.json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(JOB_POLL_SECONDS)
+
+    return {
+        "status": "failed",
+        "error": f"No result after {JOB_TIMEOUT_SECONDS}s; job {job_id} may still finish "
+                 f"at {JOBS_URL}/{job_id}"
+    }
+
 # ==================================================
 # HEADER
 # ==================================================
@@ -58,7 +243,7 @@ st.markdown("""
 # 📊 AI Data Analyst Agent  
 **Ask questions in plain English and get precise insights from your dataset.**
 
-🔹 Upload any CSV  
+🔹 Upload a CSV (optionally gzip/zstd-compressed), Parquet or Arrow file  
 🔹 Ask analytical questions  
 🔹 Backend powered by FastAPI  
 """)
@@ -72,30 +257,34 @@ with st.sidebar:
     st.header("📁 Upload Dataset")
 
     uploaded_file = st.file_uploader(
-        "Upload a CSV file",
-        type=["csv"]
+        "Upload a dataset",
+        type=["csv", "gz", "zst", "parquet", "arrow", "feather"]
     )
 
     st.markdown("---")
 
     if st.button("🧹 Clear History"):
         st.session_state.history = []
+        st.session_state.analysis_sessions = {}
         st.success("Session history cleared!")
 
 # ==================================================
 # MAIN CONTENT
 # ==================================================
 if uploaded_file:
-    try:
-        df_preview = pd.read_csv(uploaded_file, encoding="utf-8")
-    except UnicodeDecodeError:
-        df_preview = pd.read_csv(uploaded_file, encoding="latin1")
+    file_hash = get_file_hash(uploaded_file)
 
     # ---------------- Dataset Preview ----------------
     st.markdown('<div class="card">', unsafe_allow_html=True)
     with st.expander("📋 Dataset Preview", expanded=True):
-        st.dataframe(df_preview.head(20), use_container_width=True)
-        st.caption(f"📊 Total: {df_preview.shape[0]:,} rows × {df_preview.shape[1]} columns")
+        try:
+            df_preview, preview_shape = load_preview(
+                file_hash or file_key(uploaded_file), uploaded_file.getvalue()
+            )
+            st.dataframe(df_preview, use_container_width=True)
+            st.caption(f"📊 Total: {preview_shape[0]:,} rows × {preview_shape[1]} columns")
+        except (ImportError, ValueError) as e:
+            st.info(f"Preview unavailable ({e}); the file can still be analyzed.")
     st.markdown('</div>', unsafe_allow_html=True)
 
     # ---------------- Question Input ----------------
@@ -124,25 +313,29 @@ if uploaded_file:
     if analyze_clicked and question:
         try:
             with st.spinner("🚀 Sending request to backend..."):
-                response = requests.post(
-                    BACKEND_URL,
-                    data={"question": question},
-                    files={
-                        "file": (
-                            uploaded_file.name,
-                            uploaded_file.getvalue(),
-                            "text/csv"
-                        )
-                    },
-                    timeout=300
-                )
+                file_hash = ensure_dataset_uploaded(file_hash, uploaded_file)
+                response = submit_job(file_hash, question)
+
+                # Session expired or dataset evicted on the server: start over
+                if response.status_code == 404:
+                    st.session_state.analysis_sessions.pop(file_hash, None)
+                    file_hash = ensure_dataset_uploaded(file_hash, uploaded_file)
+                    response = submit_job(file_hash, question)
 
             if response.status_code != 200:
                 st.error("❌ Backend error")
                 st.text(response.text)
                 st.stop()
 
-            data = response.json()
+            with st.spinner("🧠 Analyzing..."):
+                job = wait_for_job(response.json()["job_id"])
+
+            if job["status"] == "failed":
+                st.error("❌ Analysis failed")
+                st.text(job["error"])
+                st.stop()
+
+            data = job["result"]
 
             # ---------------- DATASET INFO ----------------
             if data["type"] == "dataset_info":
@@ -165,6 +358,8 @@ if uploaded_file:
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown("### 📊 Results")
             st.dataframe(result_df, use_container_width=True)
+            if data.get("statistics"):
+                st.json(data["statistics"])
             st.markdown('</div>', unsafe_allow_html=True)
 
             st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -176,9 +371,13 @@ if uploaded_file:
             st.session_state.history.append({
                 "question": question,
                 "plan": data["plan"],
-                "result": result_df,
+                "result": result_df.head(HISTORY_RESULT_ROWS),
+                "total_rows": len(result_df),
+                "dataset_id": data.get("dataset_id"),
+                "result_id": data.get("result_id"),
                 "insight": data["insight"]
             })
+            st.session_state.history = st.session_state.history[-MAX_HISTORY:]
 
         except Exception as e:
             st.error("❌ Failed to connect to backend")
@@ -196,10 +395,19 @@ if uploaded_file:
                 st.json(item["plan"])
 
                 st.markdown("**📊 Results**")
-                st.dataframe(item["result"].head(10), use_container_width=True)
+                st.dataframe(item["result"], use_container_width=True)
+                if item.get("total_rows", 0) > len(item["result"]):
+                    caption = f"Showing {len(item['result'])} of {item['total_rows']:,} rows."
+                    # Session follow-ups and uncached answers have no stored result
+                    if item.get("result_id"):
+                        caption += (
+                            f" Full result: {DATASETS_URL}/{item['dataset_id']}"
+                            f"/results/{item['result_id']}"
+                        )
+                    st.caption(caption)
 
                 st.markdown("**💡 Answer**")
                 st.markdown(item["insight"])
 
 else:
-    st.info("👈 Upload a CSV file from the sidebar to begin analysis")
+    st.info("👈 Upload a dataset from the sidebar to begin analysis")
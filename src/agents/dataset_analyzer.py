@@ -1,19 +1,91 @@
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
 
 def analyze_dataset(df: pd.DataFrame) -> pd.DataFrame:
     """
     Returns dataset-level information as a table.
     """
 
-    info = []
+    return profile_to_frame(build_profile(df))
+
+
+def column_bounds(series: pd.Series):
+    """(min, max) of a numeric or datetime column, None for other dtypes."""
+    if is_bool_dtype(series) or not (
+        is_numeric_dtype(series) or is_datetime64_any_dtype(series)
+    ):
+        return None
+
+    low, high = series.min(), series.max()
+    if pd.isna(low):
+        return None, None
+    return low, high
+
+
+def build_profile(df: pd.DataFrame) -> dict:
+    """
+    Per-column counts, distinct values and numeric/datetime bounds, kept
+    so the table (and the optimizer's statistics) can be maintained
+    incrementally when rows are appended.
+    """
+
+    profile = {}
 
     for col in df.columns:
+        profile[col] = {
+            "dtype": str(df[col].dtype),
+            "non_null": int(df[col].notnull().sum()),
+            "missing": int(df[col].isnull().sum()),
+            "distinct": pd.Index(df[col].dropna().unique())
+        }
+
+        bounds = column_bounds(df[col])
+        if bounds is not None:
+            profile[col]["min"], profile[col]["max"] = bounds
+
+    return profile
+
+
+def update_profile(profile: dict, new_rows: pd.DataFrame, combined_dtypes=None) -> dict:
+    """
+    Fold appended rows into an existing profile without rescanning
+    the rows that were already profiled.
+    """
+
+    for col in new_rows.columns:
+        stats = profile[col]
+        new_distinct = pd.Index(new_rows[col].dropna().unique())
+
+        stats["non_null"] += int(new_rows[col].notnull().sum())
+        stats["missing"] += int(new_rows[col].isnull().sum())
+        stats["distinct"] = stats["distinct"].append(new_distinct).unique()
+
+        if combined_dtypes is not None:
+            stats["dtype"] = str(combined_dtypes[col])
+
+        if "min" in stats:
+            bounds = column_bounds(new_rows[col])
+            if bounds is None:
+                # The column no longer has a numeric/datetime dtype
+                del stats["min"], stats["max"]
+            elif bounds[0] is not None:
+                low, high = bounds
+                stats["min"] = low if stats["min"] is None else min(stats["min"], low)
+                stats["max"] = high if stats["max"] is None else max(stats["max"], high)
+
+    return profile
+
+
+def profile_to_frame(profile: dict) -> pd.DataFrame:
+    info = []
+
+    for col, stats in profile.items():
         info.append({
             "Column": col,
-            "Data Type": str(df[col].dtype),
-            "Non-Null Count": df[col].notnull().sum(),
-            "Missing Values": df[col].isnull().sum(),
-            "Unique Values": df[col].nunique()
+            "Data Type": stats["dtype"],
+            "Non-Null Count": stats["non_null"],
+            "Missing Values": stats["missing"],
+            "Unique Values": len(stats["distinct"])
         })
 
     return pd.DataFrame(info)
@@ -2,9 +2,14 @@ import streamlit as st
 import pandas as pd
 import json
 import os
-import numpy as np
 from groq import Groq
-from config import MODEL_NAME
+from config import MODEL_NAME, EXPLAINER_TOKEN_BUDGET
+from agents.result_summarizer import (
+    compact_json,
+    compact_plan,
+    records,
+    summarize_within_budget,
+)
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,55 +24,40 @@ def get_groq_client():
     return Groq(api_key=api_key)
 
 # ==================================================
-# 🛡 JSON SAFETY
+# 🔎 RESULT COMPRESSION (INTENT-AWARE, BOUNDED)
 # ==================================================
-def make_json_safe(obj):
-    if isinstance(obj, dict):
-        return {k: make_json_safe(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [make_json_safe(v) for v in obj]
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif pd.isna(obj):
-        return None
-    else:
-        return obj
-
-# ==================================================
-# 🔎 RESULT COMPRESSION (INTENT-AWARE)
-# ==================================================
-def compress_result_for_llm(result_df: pd.DataFrame, plan: dict):
+def compress_result_for_llm(result_df: pd.DataFrame, plan: dict,
+                            max_tokens: int = EXPLAINER_TOKEN_BUDGET):
     intent = plan.get("user_intent", {})
     focus = intent.get("focus")
 
     # Highest / Lowest
     if focus in ["highest", "lowest"]:
-        return result_df.head(1).to_dict(orient="records")
+        return records(result_df.head(1))
 
     # Both
     if focus == "both":
-        return (
+        return records(
             pd.concat([result_df.head(1), result_df.tail(1)])
             .drop_duplicates()
-            .to_dict(orient="records")
         )
 
-    # List intent → return names
+    # List intent → return names (capped to the budget)
     if focus == "list":
         if not result_df.empty:
             col = result_df.columns[0]
-            return result_df[col].astype(str).tolist()
+            limit = max(1, max_tokens // 8)
+            names = result_df[col].head(limit).astype(str).tolist()
+            if len(result_df) > limit:
+                names.append(f"... and {len(result_df) - limit} more")
+            return names
 
     # Count / aggregation
     if result_df.shape[0] == 1:
-        return result_df.to_dict(orient="records")
+        return records(result_df)
 
-    # Safe default
-    return result_df.head(10).to_dict(orient="records")
+    # Fixed-size statistical digest
+    return summarize_within_budget(result_df, plan, max_tokens=max_tokens)
 
 # ==================================================
 # 🧠 EXPLAINER AGENT (IMPROVED)
@@ -76,6 +66,7 @@ class ExplainerAgent:
     def __init__(self):
         self.client = get_groq_client()
         self.model = MODEL_NAME
+        self.token_budget = EXPLAINER_TOKEN_BUDGET
 
         self.system_prompt = """
 You are a senior data analyst explaining insights to business stakeholders.
@@ -91,28 +82,40 @@ Rules:
     # --------------------------------------------------
     # 💡 MAIN EXPLAIN METHOD
     # --------------------------------------------------
-    def explain(self, question: str, result_df: pd.DataFrame, plan: dict) -> str:
+    def explain(self, question: str, result_df: pd.DataFrame, plan: dict,
+                approximate: dict = None) -> str:
 
         if result_df is None or result_df.empty:
             return "No meaningful results were found for this question."
 
-        compressed_result = compress_result_for_llm(result_df, plan)
+        compressed_result = compress_result_for_llm(result_df, plan, self.token_budget)
 
         payload = {
             "question": question,
-            "analysis_plan": plan,
+            "analysis_plan": compact_plan(plan),
             "results": compressed_result,
             "total_rows": len(result_df)
         }
 
-        payload = make_json_safe(payload)
+        # Histogram quantiles / correlation coefficients computed server-side
+        statistics = result_df.attrs.get("statistics")
+        if statistics:
+            payload["statistics"] = statistics
+
+        approximate_note = ""
+        if approximate:
+            payload["approximation"] = approximate
+            approximate_note = (
+                "- These results are ESTIMATES from a sample: say so, call the numbers "
+                "approximate and mention the confidence range (_ci_low/_ci_high) when useful\n"
+            )
 
         user_prompt = f"""
 User question:
 {question}
 
 Analysis summary:
-{json.dumps(payload, indent=2)}
+{compact_json(payload)}
 
 Instructions:
 - Start with a direct 1–2 sentence answer to the question
@@ -121,7 +124,7 @@ Instructions:
 - If this is a list question, clearly list the entities
 - Avoid technical or database terms
 - End with a brief takeaway if appropriate
-
+{approximate_note}
 Format EXACTLY like this:
 
 Direct Answer and key insights:
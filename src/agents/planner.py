@@ -69,8 +69,11 @@ TREND:
 - Analyze changes over time
 - group_by must include a time column (DATE, MONTH, YEAR)
 - visualization.type = "line"
-- Example: "sales trend over time"
-  → group_by: ["DATE"], metrics: [{"column": "SALES", "operation": "sum"}], viz.type: "line"
+- time_grain = "day | week | month | quarter | year" when the question names
+  a period ("monthly", "per quarter", "by year"), otherwise null
+- Example: "monthly sales trend"
+  → group_by: ["DATE"], metrics: [{"column": "SALES", "operation": "sum"}],
+    time_grain: "month", viz.type: "line"
 
 AGGREGATION:
 - Calculate summary statistics
@@ -111,8 +114,18 @@ DISTRIBUTION:
 - visualization.type = "histogram"
 - visualization.x = column to analyze
 - visualization.y = null
+- visualization.bins = number of bins if the question asks for one, otherwise null
 - Example: "distribution of sales"
-  → viz: {type: "histogram", x: "SALES", y: null}
+  → viz: {type: "histogram", x: "SALES", y: null, bins: null}
+
+FOLLOW-UP QUESTIONS:
+- When a previous question and plan are given, decide whether the new question
+  refines them ("now only for USA", "top 3 of those", "sort them by price")
+- refine = "filtered": same analysis on fewer rows → repeat ALL previous filters,
+  group_by and metrics exactly, and ADD the new filters
+- refine = "result": work on the previous result table itself → use ONLY the
+  previous result columns, metrics = [], only sort / top_n / filters on them
+- refine = null: a new, unrelated question (ignore the previous plan)
 
 CRITICAL:
 - NEVER use placeholder values like "string", "number", "value" in filters
@@ -131,6 +144,7 @@ JSON SCHEMA:
     }
   ],
   "group_by": ["string"],
+  "time_grain": "day | week | month | quarter | year | null",
   "metrics": [
     {
       "column": "string",
@@ -146,13 +160,15 @@ JSON SCHEMA:
     "x": "string | null",
     "y": "string | null",
     "color": "string | null",
-    "top_n": "number | null"
+    "top_n": "number | null",
+    "bins": "number | null"
   },
   "user_intent": {
     "show_highest": "boolean",
     "show_lowest": "boolean",
     "focus": "highest | lowest | both"
-  }
+  },
+  "refine": "filtered | result | null"
 }
 
 Validate internally before output.
@@ -207,6 +223,10 @@ Validate internally before output.
                     valid_filters.append(f)
             plan["filters"] = valid_filters
 
+        # Follow-up refinement level (only meaningful with a previous turn)
+        if plan.get("refine") not in ("filtered", "result"):
+            plan["refine"] = None
+
         # TYPE-SPECIFIC FIXES
         if analysis_type == "distribution":
             plan["metrics"] = []
@@ -255,6 +275,8 @@ Validate internally before output.
                             f["operator"] = "in"
 
         elif analysis_type == "trend":
+            if isinstance(plan.get("time_grain"), str):
+                plan["time_grain"] = plan["time_grain"].lower()
             if plan.get("visualization"):
                 if plan["visualization"].get("type") != "line":
                     plan["visualization"]["type"] = "line"
@@ -263,10 +285,18 @@ Validate internally before output.
 
         return plan
 
-    def generate_plan(self, columns, question):
+    def generate_plan(self, columns, question, context=None):
         user_prompt = f"""
 Columns: {columns}
 Question: {question}
+"""
+
+        # Previous turn of a conversational session
+        if context:
+            user_prompt += f"""
+Previous question: {context["question"]}
+Previous plan: {json.dumps(context["plan"])}
+Previous result columns: {context["result_columns"]}
 """
 
         response = self.client.chat.completions.create(
@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+# Rough characters-per-token ratio used for prompt budgeting
+CHARS_PER_TOKEN = 4
+
+PLAN_KEYS_FOR_LLM = ["analysis_type", "filters", "group_by", "metrics", "sort"]
+
+
+# ==================================================
+# 🧾 COMPACT SERIALIZATION
+# ==================================================
+def _json_default(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else round(float(obj), 4)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    return str(obj)
+
+
+def compact_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=_json_default, ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def records(df: pd.DataFrame) -> list:
+    """JSON-ready records: floats rounded, missing values as None."""
+    rounded = df.round(4)
+    return rounded.astype(object).where(rounded.notna(), None).to_dict(orient="records")
+
+
+def compact_plan(plan: dict) -> dict:
+    compact = {k: plan[k] for k in PLAN_KEYS_FOR_LLM if plan.get(k)}
+    top_n = (plan.get("visualization") or {}).get("top_n")
+    if top_n:
+        compact["top_n"] = top_n
+    return compact
+
+
+# ==================================================
+# 📊 FIXED-SIZE RESULT DIGEST
+# ==================================================
+def _rank_column(result_df: pd.DataFrame, plan: dict):
+    sort_by = (plan.get("sort") or {}).get("by")
+    if sort_by in result_df.columns and is_numeric_dtype(result_df[sort_by]):
+        return sort_by
+
+    for m in plan.get("metrics", []):
+        col = m.get("column")
+        if col in result_df.columns and is_numeric_dtype(result_df[col]):
+            return col
+
+    numeric = _numeric_columns(result_df)
+    return numeric[0] if numeric else None
+
+
+def _numeric_columns(result_df: pd.DataFrame) -> list:
+    return [
+        col for col in result_df.columns
+        if is_numeric_dtype(result_df[col]) and not is_bool_dtype(result_df[col])
+    ]
+
+
+def summarize_result(result_df: pd.DataFrame, plan: dict, top_k: int = 5,
+                     quantiles=(0.25, 0.5, 0.75)) -> dict:
+    """
+    Vectorized digest of a result whose size does not depend on the
+    number of rows: top/bottom k, quantiles, totals, group count and
+    null shares.
+    """
+    n_rows = len(result_df)
+    digest = {"total_rows": n_rows}
+
+    group_by = [c for c in plan.get("group_by", []) if c in result_df.columns]
+    if group_by:
+        digest["groups"] = n_rows
+
+    # Small results go in whole
+    if n_rows <= 2 * top_k:
+        digest["rows"] = records(result_df)
+        return digest
+
+    numeric = _numeric_columns(result_df)
+    if numeric:
+        frame = result_df[numeric]
+        stats = pd.DataFrame({
+            "total": frame.sum(),
+            "mean": frame.mean(),
+            "min": frame.min(),
+            "max": frame.max(),
+            "null_share": frame.isna().mean()
+        })
+        if quantiles:
+            q = frame.quantile(list(quantiles)).T
+            q.columns = [f"p{int(round(p * 100))}" for p in quantiles]
+            stats = stats.join(q)
+        digest["numeric"] = {
+            col: row for col, row in zip(stats.index, records(stats))
+        }
+
+    other = [c for c in result_df.columns if c not in numeric]
+    if other:
+        digest["categorical"] = {
+            col: {
+                "distinct": int(result_df[col].nunique()),
+                "null_share": round(float(result_df[col].isna().mean()), 4)
+            }
+            for col in other
+        }
+
+    rank_col = _rank_column(result_df, plan)
+    if rank_col is not None:
+        digest["ranked_by"] = rank_col
+        digest["top"] = records(result_df.nlargest(top_k, rank_col))
+        digest["bottom"] = records(result_df.nsmallest(top_k, rank_col))
+    else:
+        digest["sample"] = records(result_df.head(top_k))
+
+    return digest
+
+
+def summarize_within_budget(result_df: pd.DataFrame, plan: dict,
+                            max_tokens: int = 1500, top_k: int = 5) -> dict:
+    """
+    Shrinks the digest (fewer ranked rows, then no quantiles) until its
+    compact JSON fits the token budget.
+    """
+    quantiles = (0.25, 0.5, 0.75)
+
+    while True:
+        digest = summarize_result(result_df, plan, top_k=top_k, quantiles=quantiles)
+        if estimate_tokens(compact_json(digest)) <= max_tokens:
+            return digest
+
+        if top_k > 1:
+            top_k //= 2
+        elif quantiles:
+            quantiles = ()
+        else:
+            digest.pop("categorical", None)
+            return digest
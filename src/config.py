@@ -6,5 +6,48 @@ load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 MODEL_NAME = "llama-3.1-8b-instant"
 
+# Executor worker pool (time limit mirrors experiments/exp_01.yaml)
+EXECUTOR_POOL_MODE = os.getenv("EXECUTOR_POOL_MODE", "thread")
+EXECUTOR_MAX_WORKERS = int(os.getenv("EXECUTOR_MAX_WORKERS", "4"))
+EXECUTOR_TIME_LIMIT_SECONDS = float(os.getenv("EXECUTOR_TIME_LIMIT_SECONDS", "30"))
+
+# Uploaded datasets kept in memory for reuse and incremental appends
+MAX_DATASETS = int(os.getenv("MAX_DATASETS", "8"))
+
+# Ingest-time aggregate cube over dimension columns with at most this many
+# distinct values. Opt-in (0 = off): building it dominates ingest time on
+# large uploads, so enable it for datasets queried many times (e.g. 50)
+CUBE_MAX_CARDINALITY = int(os.getenv("CUBE_MAX_CARDINALITY", "0"))
+
+# String columns with at most this many distinct values become categoricals
+CATEGORICAL_MAX_CARDINALITY = int(os.getenv("CATEGORICAL_MAX_CARDINALITY", "1000"))
+
+# Approximate / progressive query mode
+APPROX_SAMPLE_FRACTION = float(os.getenv("APPROX_SAMPLE_FRACTION", "0.01"))
+APPROX_PROGRESSIVE_FRACTIONS = [
+    float(f) for f in os.getenv("APPROX_PROGRESSIVE_FRACTIONS", "0.01,0.05,0.25,1.0").split(",")
+]
+APPROX_TARGET_RELATIVE_ERROR = float(os.getenv("APPROX_TARGET_RELATIVE_ERROR", "0.01"))
+
+# Approximate token budget for the result digest sent to the explainer
+EXPLAINER_TOKEN_BUDGET = int(os.getenv("EXPLAINER_TOKEN_BUDGET", "1500"))
+
+# Memory admission control for parsing uploads (estimated bytes in flight)
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "1024"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+
+# Conversational sessions (previous turn kept for follow-up questions)
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "64"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+
+# Background analysis jobs (results persisted in SQLite for polling)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+# Per-call executor limit for background jobs; synchronous requests keep
+# EXECUTOR_TIME_LIMIT_SECONDS
+JOB_TIME_LIMIT_SECONDS = float(os.getenv("JOB_TIME_LIMIT_SECONDS", "600"))
+
 if not GROQ_API_KEY:
     raise ValueError("❌ GROQ_API_KEY not found in .env")
@@ -0,0 +1,283 @@
+"""
+Load generator driven by experiments/*.yaml.
+
+    python -m evaluation.runner experiments/exp_02.yaml --mode inprocess
+    python -m evaluation.runner experiments/exp_02.yaml --mode http --concurrency 1 4 8
+
+Runs every question `num_runs` times at each concurrency level and writes
+a JSON report with throughput, per-stage latency percentiles, error rate
+and plan consistency, for comparison between versions.
+"""
+import argparse
+import json
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from ingest.readers import read_dataset
+from store.dataset_store import Dataset
+
+DEFAULT_URL = "http://localhost:8000"
+PERCENTILES = (50, 95, 99)
+
+
+# -----------------------------------------------------
+# 📂 INPUTS
+# -----------------------------------------------------
+def load_experiment(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_questions(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+# -----------------------------------------------------
+# 🎯 TARGETS
+# -----------------------------------------------------
+class InProcessTarget:
+    """Calls the planner/validator/executor/explainer pipeline directly."""
+
+    def __init__(self, dataset_path: str, explain: bool = True):
+        from agents.planner import PlannerAgent
+        from config import CATEGORICAL_MAX_CARDINALITY, CUBE_MAX_CARDINALITY
+
+        # Same ingest (datetimes, categoricals, cube) as an uploaded dataset
+        self.dataset = Dataset(
+            "load-test",
+            read_dataset(Path(dataset_path).read_bytes()),
+            cube_max_cardinality=CUBE_MAX_CARDINALITY,
+            categorical_max_cardinality=CATEGORICAL_MAX_CARDINALITY,
+        )
+        self.planner = PlannerAgent()
+        self.explainer = None
+
+        if explain:
+            from agents.explainer import ExplainerAgent
+            self.explainer = ExplainerAgent()
+
+    def __call__(self, question: str) -> dict:
+        from pipeline import run_pipeline
+        return run_pipeline(
+            self.dataset.df, question, self.planner, self.explainer,
+            cube=self.dataset.cube
+        )
+
+
+class HttpTarget:
+    """Drives a running backend; the dataset is uploaded once up front."""
+
+    def __init__(self, dataset_path: str, base_url: str = DEFAULT_URL):
+        import requests
+
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip("/")
+
+        with open(dataset_path, "rb") as f:
+            response = self.session.post(
+                f"{self.base_url}/datasets", files={"file": f}, timeout=300
+            )
+        response.raise_for_status()
+        self.dataset_id = response.json()["dataset_id"]
+
+    def __call__(self, question: str) -> dict:
+        response = self.session.post(
+            f"{self.base_url}/analyze",
+            # Every run calls the planner, so consistency and plan time are measured
+            data={"question": question, "dataset_id": self.dataset_id, "replan": "true"},
+            timeout=300
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+# -----------------------------------------------------
+# 🚀 LOAD LEVEL
+# -----------------------------------------------------
+def _run_one(target, question: str, run: int) -> dict:
+    started = time.perf_counter()
+    try:
+        response = target(question)
+        return {
+            "question": question,
+            "run": run,
+            "ok": True,
+            "latency": time.perf_counter() - started,
+            "timings": response.get("timings", {}),
+            "plan_hash": response.get("plan_key")
+        }
+    except Exception as e:
+        return {
+            "question": question,
+            "run": run,
+            "ok": False,
+            "latency": time.perf_counter() - started,
+            "timings": {},
+            "error": f"{type(e).__name__}: {e}"
+        }
+
+
+def run_level(target, questions: list, num_runs: int, concurrency: int,
+              seed: int = 42) -> dict:
+    tasks = [(q, run) for run in range(num_runs) for q in questions]
+    random.Random(seed).shuffle(tasks)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(lambda t: _run_one(target, *t), tasks))
+    wall_seconds = time.perf_counter() - started
+
+    return summarize_level(samples, wall_seconds, concurrency)
+
+
+# -----------------------------------------------------
+# 📊 REPORTING
+# -----------------------------------------------------
+def latency_summary(values: list) -> dict:
+    if not values:
+        return {}
+    arr = np.asarray(values)
+    summary = {f"p{p}": float(np.percentile(arr, p)) for p in PERCENTILES}
+    summary["mean"] = float(arr.mean())
+    return summary
+
+
+def plan_consistency(samples: list) -> float:
+    """
+    Average, over questions, of the share of successful runs that
+    produced that question's most common plan.
+    """
+    by_question = defaultdict(list)
+    for s in samples:
+        if s["ok"] and s["plan_hash"]:
+            by_question[s["question"]].append(s["plan_hash"])
+
+    if not by_question:
+        return 0.0
+
+    shares = [
+        Counter(hashes).most_common(1)[0][1] / len(hashes)
+        for hashes in by_question.values()
+    ]
+    return float(np.mean(shares))
+
+
+def summarize_level(samples: list, wall_seconds: float, concurrency: int) -> dict:
+    ok = [s for s in samples if s["ok"]]
+
+    stage_latencies = defaultdict(list)
+    for s in ok:
+        stage_latencies["total"].append(s["latency"])
+        for stage, seconds in s["timings"].items():
+            stage_latencies[stage].append(seconds)
+
+    error_rate = 1 - len(ok) / len(samples) if samples else 0.0
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "wall_seconds": wall_seconds,
+        "throughput_rps": len(ok) / wall_seconds if wall_seconds else 0.0,
+        "error_rate": error_rate,
+        "execution_success_rate": 1 - error_rate,
+        "plan_consistency": plan_consistency(samples),
+        "latency_seconds": {
+            stage: latency_summary(values)
+            for stage, values in stage_latencies.items()
+        },
+        "errors": Counter(s["error"] for s in samples if not s["ok"]).most_common(10)
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+# -----------------------------------------------------
+# 🖥 CLI
+# -----------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("experiment", help="experiments/*.yaml file")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--url", default=DEFAULT_URL, help="backend URL (http mode)")
+    parser.add_argument("--dataset", help="overrides load_test.dataset")
+    parser.add_argument("--questions", help="overrides load_test.questions")
+    parser.add_argument("--concurrency", type=int, nargs="+", help="overrides load_test.concurrency")
+    parser.add_argument("--num-runs", type=int, help="overrides evaluation.num_runs")
+    parser.add_argument("--no-explain", action="store_true", help="skip the explainer (inprocess mode)")
+    parser.add_argument("--output", help="report path (default reports/<name>-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    experiment = load_experiment(args.experiment)
+    load_cfg = experiment.get("load_test", {})
+    eval_cfg = experiment.get("evaluation", {})
+
+    dataset = args.dataset or load_cfg.get("dataset")
+    questions_path = args.questions or load_cfg.get("questions")
+    if not dataset or not questions_path:
+        parser.error("a dataset and a question corpus are required")
+
+    questions = load_questions(questions_path)
+    levels = args.concurrency or load_cfg.get("concurrency", [1])
+    num_runs = args.num_runs or eval_cfg.get("num_runs", 1)
+    seed = experiment.get("seed", 42)
+
+    if args.mode == "http":
+        target = HttpTarget(dataset, args.url)
+    else:
+        target = InProcessTarget(dataset, explain=not args.no_explain)
+
+    results = []
+    for concurrency in levels:
+        print(f"▶ concurrency={concurrency} runs={num_runs} questions={len(questions)}")
+        level = run_level(target, questions, num_runs, concurrency, seed)
+        print(
+            f"  {level['throughput_rps']:.2f} req/s, "
+            f"p95 {level['latency_seconds'].get('total', {}).get('p95', 0):.2f}s, "
+            f"errors {level['error_rate']:.1%}, "
+            f"plan consistency {level['plan_consistency']:.1%}"
+        )
+        results.append(level)
+
+    name = experiment.get("name", Path(args.experiment).stem)
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = Path(args.output or f"reports/{name}-{timestamp}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    report = {
+        "experiment": name,
+        "experiment_file": args.experiment,
+        "revision": _git_revision(),
+        "started_at": timestamp,
+        "mode": args.mode,
+        "model": experiment.get("model"),
+        "dataset": dataset,
+        "num_questions": len(questions),
+        "num_runs": num_runs,
+        "levels": results
+    }
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
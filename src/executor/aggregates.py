@@ -0,0 +1,111 @@
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from executor.executor import bucket_time, time_columns
+
+
+# Operations that can be rebuilt from (sum, count, min, max) partials
+MERGEABLE_OPERATIONS = {"sum", "count", "mean", "min", "max"}
+
+# Partial state needed for each metric operation
+_PARTIALS_FOR_OPERATION = {
+    "sum": ["sum"],
+    "count": ["count"],
+    "mean": ["sum", "count"],
+    "min": ["min"],
+    "max": ["max"],
+}
+
+# How partials of the same kind combine across chunks
+_MERGE_OPERATION = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def _agg_map(plan: dict) -> dict:
+    # Same semantics as the executor: last metric per column wins
+    agg_map = {}
+    for m in plan.get("metrics", []):
+        agg_map[m["column"]] = m["operation"]
+    return agg_map
+
+
+def is_mergeable(df: pd.DataFrame, plan: dict) -> bool:
+    """
+    True when the plan's aggregate can be maintained from partials,
+    i.e. a group_by over numeric sum/count/mean/min/max metrics.
+    """
+    agg_map = _agg_map(plan)
+
+    if not plan.get("group_by") or not agg_map:
+        return False
+
+    # Without an explicit grain the buckets depend on the data's time span
+    if time_columns(df, plan) and not plan.get("time_grain"):
+        return False
+
+    for col, op in agg_map.items():
+        if op not in MERGEABLE_OPERATIONS:
+            return False
+        if op != "count" and not is_numeric_dtype(df[col]):
+            return False
+
+    return True
+
+
+def partial_columns(plan: dict) -> list:
+    names = []
+    for col, op in _agg_map(plan).items():
+        for part in _PARTIALS_FOR_OPERATION[op]:
+            names.append(f"{col}__{part}")
+    return names
+
+
+def compute_partials(working_df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    """
+    Per-group partial aggregates, one column per (metric column, partial).
+    """
+    named = {
+        name: tuple(name.rsplit("__", 1))
+        for name in partial_columns(plan)
+    }
+
+    working_df = bucket_time(working_df, plan)
+    return working_df.groupby(plan["group_by"], observed=True).agg(**named)
+
+
+def merge_partials(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    merge_map = {
+        name: _MERGE_OPERATION[name.rsplit("__", 1)[1]]
+        for name in left.columns
+    }
+    combined = pd.concat([left, right])
+    return combined.groupby(
+        level=list(range(combined.index.nlevels)), observed=True
+    ).agg(merge_map)
+
+
+def rollup_partials(partials: pd.DataFrame, group_by: list, parts: list,
+                    dropna: bool = True) -> pd.DataFrame:
+    """
+    Re-aggregate flat partials (group keys as columns) to a coarser
+    grouping, keeping only the requested partial columns.
+    """
+    merge_map = {
+        name: _MERGE_OPERATION[name.rsplit("__", 1)[1]]
+        for name in parts
+    }
+    return partials.groupby(group_by, dropna=dropna, observed=True).agg(merge_map)
+
+
+def aggregate_from_partials(partials: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    """
+    Rebuild the executor's group_by result from partial aggregates.
+    """
+    result = pd.DataFrame(index=partials.index)
+
+    for col, op in _agg_map(plan).items():
+        if op == "mean":
+            result[col] = partials[f"{col}__sum"] / partials[f"{col}__count"]
+        else:
+            result[col] = partials[f"{col}__{op}"]
+
+    return result.reset_index()
@@ -0,0 +1,272 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from executor.executor import (
+    apply_filters,
+    bucket_time,
+    execute_plan,
+    finalize_result,
+    resolve_time_grain,
+    storage_dtype,
+    time_columns,
+    _coerce_numeric,
+    _checkpoint,
+)
+
+# Operations estimated with a confidence interval; others use sample values
+ESTIMATED_OPERATIONS = {"sum", "count", "mean"}
+SAMPLE_OPERATIONS = {"min", "max", "median", "std"}
+
+
+# -----------------------------------------------------
+# 🎲 SAMPLE FIRST (only sampled rows are bucketed / grouped)
+# -----------------------------------------------------
+def _stratum_codes(df, strata):
+    """
+    Per-row stratum code combined from categorical codes (-1 for a null
+    key), or None unless every stratum column is categorical. No groupby:
+    the codes already exist, so this is a few vectorized array passes.
+    """
+    columns = [df[col] for col in strata]
+    if not all(isinstance(s.dtype, pd.CategoricalDtype) for s in columns):
+        return None
+
+    dims = [len(s.cat.categories) for s in columns]
+    if not all(dims) or math.prod(dims) > max(len(df), 1) * 4:
+        return None
+
+    codes = [s.cat.codes.to_numpy().astype(np.int64) for s in columns]
+    missing = np.logical_or.reduce([c < 0 for c in codes])
+    combined = np.ravel_multi_index([np.maximum(c, 0) for c in codes], dims)
+    return np.where(missing, -1, combined)
+
+
+def _bucket_sample(sample, df, plan):
+    """bucket_time for sampled rows, each grain resolved on the full column."""
+    for col in time_columns(df, plan):
+        grain = resolve_time_grain(df[col], plan.get("time_grain"))
+        sample = bucket_time(sample, {"group_by": [col], "time_grain": grain})
+    return sample
+
+
+def _draw_sample(df, plan, fraction, min_stratum_rows, random_state):
+    """
+    Returns (sample_df, sample_codes, population, sampled) where
+    sample_codes index population / sampled (per stratum, or per group of
+    a uniform sample) and -1 marks rows outside every group.
+
+    Rows are Bernoulli-sampled against one fixed draw of uniforms, so
+    larger fractions always contain smaller samples. Categorical strata
+    get rate max(fraction, min_stratum_rows / size) each; otherwise the
+    sample is uniform and grouped afterwards (domain estimation).
+    """
+    strata = plan.get("group_by", [])
+    rng = np.random.default_rng(random_state)
+    uniforms = rng.random(len(df))
+
+    codes = _stratum_codes(df, strata) if strata else None
+    if codes is not None:
+        sizes = np.bincount(codes[codes >= 0])
+        rates = np.minimum(1.0, np.maximum(fraction, min_stratum_rows / np.maximum(sizes, 1)))
+        positions = np.flatnonzero((codes >= 0) & (uniforms < rates[np.maximum(codes, 0)]))
+        sample = df.iloc[positions]
+
+        strata_present, dense = np.unique(codes[positions], return_inverse=True)
+        population = sizes[strata_present].astype(float)
+        sampled = np.bincount(dense, minlength=len(strata_present)).astype(float)
+        return sample, dense, population, sampled
+
+    rate = min(1.0, max(fraction, min_stratum_rows / max(len(df), 1)))
+    sample = _bucket_sample(df.iloc[np.flatnonzero(uniforms < rate)], df, plan)
+
+    if strata:
+        dense = sample.groupby(strata, observed=True, sort=True).ngroup().to_numpy()
+    else:
+        dense = np.zeros(len(sample), dtype=np.int64)
+
+    n_groups = int(dense.max()) + 1 if len(dense) and dense.max() >= 0 else 0
+    population = np.full(n_groups, float(len(df)))
+    sampled = np.full(n_groups, float(len(sample)))
+    return sample, dense, population, sampled
+
+
+# -----------------------------------------------------
+# 📐 ESTIMATORS (stratified domain estimation, vectorized)
+# -----------------------------------------------------
+def _per_stratum(codes, weights, n_strata):
+    return np.bincount(codes, weights=weights, minlength=n_strata)
+
+
+def _estimate(values, in_domain, codes, population, n, z):
+    """
+    Per-stratum estimates of sum/count/mean of values over the rows in
+    the domain, each as (estimate, half_width) arrays. n is the number of
+    sampled rows each estimate draws on: the stratum's own rows, or the
+    whole sample for a group of a uniform sample (rows outside the group
+    contribute zeros).
+    """
+    n_strata = len(population)
+    present = in_domain & ~np.isnan(values)
+    y = np.where(present, values, 0.0)
+    c = present.astype(float)
+
+    safe_n = np.maximum(n, 1)
+    fpc = np.clip(1 - n / population, 0.0, 1.0)
+    scale = z * population * np.sqrt(fpc / safe_n)
+
+    def _std(v):
+        total = _per_stratum(codes, v, n_strata)
+        squares = _per_stratum(codes, v * v, n_strata)
+        var = (squares - total * total / safe_n) / np.maximum(n - 1, 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    sum_y = _per_stratum(codes, y, n_strata)
+    sum_c = _per_stratum(codes, c, n_strata)
+
+    sum_est = population * sum_y / safe_n
+    count_est = population * sum_c / safe_n
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = sum_y / sum_c
+        residual = y - np.nan_to_num(ratio)[codes] * c
+        mean_hw = scale * _std(residual) / count_est
+
+    return {
+        "sum": (sum_est, scale * _std(y)),
+        "count": (count_est, scale * _std(c)),
+        "mean": (ratio, mean_hw),
+        "rows": sum_c
+    }
+
+
+def _agg_map(plan):
+    agg_map = {}
+    for m in plan.get("metrics", []):
+        agg_map[m["column"]] = m["operation"]
+    return agg_map
+
+
+def is_approximable(df, plan) -> bool:
+    agg_map = _agg_map(plan)
+    if not agg_map:
+        return False
+
+    group_by = plan.get("group_by", [])
+    if not group_by:
+        # Only the row count fast path aggregates without group_by;
+        # distinct counts of identifier columns cannot be scaled up
+        metrics = plan.get("metrics", [])
+        return (
+            len(metrics) == 1
+            and metrics[0]["operation"] == "count"
+            and storage_dtype(df[metrics[0]["column"]].dtype) != "object"
+        )
+
+    return all(
+        op in ESTIMATED_OPERATIONS | SAMPLE_OPERATIONS
+        for op in agg_map.values()
+    )
+
+
+# -----------------------------------------------------
+# ⚡ APPROXIMATE EXECUTION
+# -----------------------------------------------------
+def execute_plan_approximate(df, plan, sample_fraction=0.01, confidence=0.95,
+                             min_stratum_rows=30, random_state=42,
+                             cancel_token=None):
+    """
+    Evaluate a plan on a stratified sample (strata = group_by columns).
+
+    sum/count/mean come back as estimates with `<col>_ci_low` and
+    `<col>_ci_high` columns; min/max/median/std are sample values.
+    result_df.attrs["approximate"] describes the sample so callers can
+    state that the answer is approximate. Plans that cannot be estimated
+    run exactly.
+    """
+    if not is_approximable(df, plan) or sample_fraction >= 1:
+        result_df, fig, filtered = execute_plan(df, plan, cancel_token)
+        result_df.attrs["approximate"] = None
+        return result_df, fig, filtered
+
+    group_by = plan.get("group_by", [])
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    sample, sample_codes, population, sampled = _draw_sample(
+        df, plan, sample_fraction, min_stratum_rows, random_state
+    )
+    _checkpoint(cancel_token)
+
+    in_domain = pd.Series(False, index=sample.index)
+    in_domain[apply_filters(sample, plan.get("filters", [])).index] = True
+    _checkpoint(cancel_token)
+
+    # Rows with a null group key only count towards the sample size
+    outside = sample_codes < 0
+    codes = np.where(outside, 0, sample_codes)
+    domain = in_domain.to_numpy() & ~outside
+
+    first = np.full(len(population), -1)
+    inside = np.flatnonzero(~outside)
+    first[codes[inside][::-1]] = inside[::-1]
+
+    agg_map = _agg_map(plan)
+    row_count_plan = not group_by
+
+    result_df = sample[group_by].iloc[first].reset_index(drop=True)
+    has_rows = np.zeros(len(population), dtype=bool)
+
+    for col, op in agg_map.items():
+        out_col = "count" if row_count_plan else col
+
+        if row_count_plan:
+            values = pd.Series(1.0, index=sample.index)
+        elif op == "count":
+            present = sample[col].notnull()
+            values = present.astype(float).where(present)
+        elif is_numeric_dtype(sample[col]):
+            values = sample[col]
+        else:
+            values = _coerce_numeric(sample[col])
+
+        values = values.to_numpy(dtype=float, na_value=np.nan)
+        est = _estimate(values, domain, codes, population, sampled, z)
+        has_rows |= est["rows"] > 0
+
+        if op in ESTIMATED_OPERATIONS:
+            value, half_width = est[op]
+            result_df[out_col] = value
+            result_df[f"{out_col}_ci_low"] = value - half_width
+            result_df[f"{out_col}_ci_high"] = value + half_width
+        else:
+            in_sample = pd.Series(np.where(domain, values, np.nan))
+            result_df[out_col] = in_sample.groupby(codes).agg(op).to_numpy()
+
+    if not row_count_plan:
+        result_df = result_df[has_rows].reset_index(drop=True)
+
+    result_df, fig, _ = finalize_result(result_df, plan)
+    result_df.attrs["approximate"] = {
+        "sample_rows": len(sample),
+        "population_rows": len(df),
+        "sample_fraction": len(sample) / len(df) if len(df) else 1.0,
+        "confidence": confidence,
+        "stratified_by": group_by
+    }
+    return result_df, fig, None
+
+
+def max_relative_error(result_df) -> float:
+    """Largest CI half-width relative to its estimate (0 when exact)."""
+    worst = 0.0
+    for col in result_df.columns:
+        if not col.endswith("_ci_high"):
+            continue
+        base = col[: -len("_ci_high")]
+        half_width = (result_df[col] - result_df[base]).abs()
+        scale = result_df[base].abs().replace(0, np.nan)
+        worst = max(worst, float((half_width / scale).max(skipna=True) or 0.0))
+    return worst
@@ -0,0 +1,184 @@
+import copy
+from itertools import combinations
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from executor.executor import apply_filters, storage_dtype
+from executor.aggregates import (
+    MERGEABLE_OPERATIONS,
+    partial_columns,
+    rollup_partials,
+    aggregate_from_partials,
+)
+
+CUBE_FILTER_OPERATORS = {"==", "!=", "in"}
+ROW_COUNT = "__rows"
+
+_CUBE_PARTS = ["sum", "count", "min", "max"]
+
+
+# -----------------------------------------------------
+# 🧊 PRECOMPUTED AGGREGATE CUBE
+# -----------------------------------------------------
+class AggregateCube:
+    """
+    Mergeable partial aggregates of every numeric measure over each
+    low-cardinality dimension column and each pair of them.
+    """
+
+    def __init__(self, dimensions: list, measures: list, dtypes: dict):
+        self.dimensions = dimensions
+        self.measures = measures
+        self.dtypes = dtypes
+        self.cuboids = {}
+
+    # --------------------------------------------------
+    # 🏗 BUILD
+    # --------------------------------------------------
+    @classmethod
+    def build(cls, df: pd.DataFrame, max_cardinality: int = 50,
+              max_dimensions: int = 12):
+        cardinality = df.nunique()
+        # Datetime columns are bucketed per plan, so they are never dimensions
+        dimensions = [
+            col for col in cardinality.sort_values().index
+            if 1 < cardinality[col] <= max_cardinality
+            and not is_datetime64_any_dtype(df[col])
+        ][:max_dimensions]
+
+        if not dimensions:
+            return None
+
+        measures = [
+            col for col in df.columns
+            if col not in dimensions and is_numeric_dtype(df[col])
+        ]
+
+        cube = cls(dimensions, measures, df.dtypes.to_dict())
+        cube.cuboids = cube._compute_cuboids(df)
+        return cube
+
+    def _rollup(self, frame: pd.DataFrame, key: tuple) -> pd.DataFrame:
+        parts = [c for c in frame.columns if "__" in c and c != ROW_COUNT]
+        merged = rollup_partials(frame, list(key), parts, dropna=False).join(
+            frame.groupby(list(key), dropna=False, observed=True)[ROW_COUNT].sum()
+        )
+        return merged.reset_index()
+
+    def _compute_cuboids(self, df: pd.DataFrame) -> dict:
+        named = {
+            f"{col}__{part}": (col, part)
+            for col in self.measures
+            for part in _CUBE_PARTS
+        }
+        named[ROW_COUNT] = (self.dimensions[0], "size")
+
+        cuboids = {}
+        # dropna=False keeps null keys so "!=" filters stay exact
+        for key in combinations(self.dimensions, 2):
+            cuboids[key] = (
+                df.groupby(list(key), dropna=False, observed=True)
+                .agg(**named)
+                .reset_index()
+            )
+
+        # Single-dimension cuboids roll up from a pair instead of rescanning
+        for dim in self.dimensions:
+            pairs = [key for key in cuboids if len(key) == 2 and dim in key]
+            if pairs:
+                cuboids[(dim,)] = self._rollup(cuboids[pairs[0]], (dim,))
+            else:
+                cuboids[(dim,)] = (
+                    df.groupby([dim], dropna=False, observed=True)
+                    .agg(**named)
+                    .reset_index()
+                )
+
+        return cuboids
+
+    def copy(self) -> "AggregateCube":
+        # append replaces cuboids rather than changing them
+        clone = copy.copy(self)
+        clone.cuboids = dict(self.cuboids)
+        return clone
+
+    def append(self, new_rows: pd.DataFrame):
+        new_cuboids = self._compute_cuboids(new_rows)
+
+        for key, cuboid in self.cuboids.items():
+            combined = pd.concat([cuboid, new_cuboids[key]], ignore_index=True)
+            self.cuboids[key] = self._rollup(combined, key)
+
+    # --------------------------------------------------
+    # 🔎 ANSWER PLANS
+    # --------------------------------------------------
+    def _cuboid_for(self, columns: set):
+        candidates = [
+            key for key in self.cuboids
+            if columns <= set(key)
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda k: len(self.cuboids[k]))
+
+    def _answer_key(self, plan: dict):
+        """Cuboid that serves the plan exactly, or None."""
+        filters = plan.get("filters", [])
+        group_by = plan.get("group_by", [])
+        metrics = plan.get("metrics", [])
+
+        for f in filters:
+            if f.get("column") not in self.dimensions:
+                return None
+            if f.get("operator") not in CUBE_FILTER_OPERATORS:
+                return None
+
+        needed = {f["column"] for f in filters} | set(group_by)
+
+        # Row / distinct count fast path of the executor
+        if not group_by and len(metrics) == 1 and metrics[0]["operation"] == "count":
+            count_col = metrics[0]["column"]
+            is_identifier = storage_dtype(self.dtypes.get(count_col)) == "object"
+            if is_identifier and count_col not in self.dimensions:
+                return None
+            return self._cuboid_for(needed | ({count_col} if is_identifier else set()))
+
+        if not group_by or not metrics:
+            return None
+
+        for m in metrics:
+            if m["operation"] not in MERGEABLE_OPERATIONS:
+                return None
+            if m["column"] not in self.measures:
+                return None
+
+        return self._cuboid_for(needed)
+
+    def answer_cost(self, plan: dict):
+        """Rows of the cuboid that would answer the plan, or None."""
+        key = self._answer_key(plan)
+        return None if key is None else len(self.cuboids[key])
+
+    def answer(self, plan: dict):
+        """
+        Returns the aggregated (pre-sort) result for plans the cube can
+        serve exactly, or None to fall back to a raw scan.
+        """
+        key = self._answer_key(plan)
+        if key is None:
+            return None
+
+        filtered = apply_filters(self.cuboids[key], plan.get("filters", []))
+        group_by = plan.get("group_by", [])
+
+        if not group_by:
+            count_col = plan["metrics"][0]["column"]
+            if storage_dtype(self.dtypes.get(count_col)) == "object":
+                count = filtered[count_col].nunique()
+            else:
+                count = int(filtered[ROW_COUNT].sum())
+            return pd.DataFrame({"count": [count]})
+
+        partials = rollup_partials(filtered, group_by, partial_columns(plan))
+        return aggregate_from_partials(partials, plan)
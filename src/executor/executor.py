@@ -1,6 +1,22 @@
 import json
+import numpy as np
 import pandas as pd
 import plotly.express as px
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+# Plan time_grain → pandas period alias
+TIME_GRAINS = {"day": "D", "week": "W", "month": "M", "quarter": "Q", "year": "Y"}
+
+# Approximate length of each grain, for picking one when the plan has none
+_GRAIN_DAYS = {"day": 1, "week": 7, "month": 30.44, "quarter": 91.31, "year": 365.25}
+
+MAX_TIME_BUCKETS = 120
+
+# Distribution / correlation results have a fixed size whatever the data size
+MAX_HISTOGRAM_BINS = 100
+MAX_CATEGORY_BARS = 50
+SCATTER_SAMPLE_ROWS = 1000
+SUMMARY_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
 
 
 # -----------------------------------------------------
@@ -16,31 +32,97 @@ def _coerce_numeric(series: pd.Series) -> pd.Series:
 
 
 # -----------------------------------------------------
-# ⚙️ MAIN EXECUTION ENGINE
+# 🏷 STORAGE DTYPE (categoricals report their categories' dtype)
+# -----------------------------------------------------
+def storage_dtype(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return dtype.categories.dtype
+    return dtype
+
+
+# -----------------------------------------------------
+# 🛑 CANCELLATION CHECKPOINT
+# -----------------------------------------------------
+def _checkpoint(cancel_token):
+    if cancel_token is not None:
+        cancel_token.check()
+
+
+# -----------------------------------------------------
+# 📅 TIME BUCKETING (datetime group_by columns → day/week/.../year)
 # -----------------------------------------------------
-def execute_plan(df, plan):
+def time_columns(df, plan):
+    return [
+        col for col in plan.get("group_by", [])
+        if col in df.columns and is_datetime64_any_dtype(df[col])
+    ]
+
+
+def resolve_time_grain(series, grain=None):
+    """The plan's grain, else the finest one giving at most MAX_TIME_BUCKETS."""
+    if grain:
+        return grain
+
+    span = series.max() - series.min()
+    if pd.isna(span):
+        return "day"
+
+    for name, days in _GRAIN_DAYS.items():
+        if span.days / days < MAX_TIME_BUCKETS:
+            return name
+    return "year"
+
+
+def bucket_time(df, plan):
+    """
+    Floor datetime group_by columns to the start of their time bucket so
+    trends aggregate to one row per period instead of per timestamp.
+    """
+    columns = time_columns(df, plan)
+    if not columns:
+        return df
+
+    bucketed = {}
+    for col in columns:
+        grain = resolve_time_grain(df[col], plan.get("time_grain"))
+        bucketed[col] = df[col].dt.to_period(TIME_GRAINS[grain]).dt.start_time
+
+    return df.assign(**bucketed)
+
+
+# -----------------------------------------------------
+# 🔎 FILTERS
+# -----------------------------------------------------
+def filter_value(f):
+    val = f.get("value")
+
+    # Fix stringified lists defensively
+    if isinstance(val, str) and val.startswith("[") and val.endswith("]"):
+        try:
+            val = json.loads(val.replace("'", '"'))
+        except Exception:
+            pass
+
+    return val
+
+
+def apply_filters(df, filters, cancel_token=None):
     working_df = df.copy()
-    original_filtered_df = None
 
-    # =================================================
-    # 🔎 FILTERS
-    # =================================================
-    for f in plan.get("filters", []):
+    for f in filters:
+        _checkpoint(cancel_token)
+
         col = f.get("column")
         op = f.get("operator")
-        val = f.get("value")
-
-        # Fix stringified lists defensively
-        if isinstance(val, str) and val.startswith("[") and val.endswith("]"):
-            try:
-                val = json.loads(val.replace("'", '"'))
-            except Exception:
-                pass
+        val = filter_value(f)
 
         # 🔥 AUTO FIX: numeric comparison on string columns
         if op in {">", "<", ">=", "<="}:
-            working_df[col] = _coerce_numeric(working_df[col])
-            val = float(val)
+            if is_datetime64_any_dtype(working_df[col]):
+                val = pd.Timestamp(str(val))
+            else:
+                working_df[col] = _coerce_numeric(working_df[col])
+                val = float(val)
 
         if op == "==":
             working_df = working_df[working_df[col] == val]
@@ -63,17 +145,146 @@ def execute_plan(df, plan):
         elif op == "in":
             if not isinstance(val, list):
                 val = [val]
+            # isin() does not parse strings the way comparisons do
+            if is_datetime64_any_dtype(working_df[col]):
+                val = [v if pd.isna(v) else pd.to_datetime(str(v)) for v in val]
             working_df = working_df[working_df[col].isin(val)]
 
-    # Save filtered data (for explainer / dual intent)
-    original_filtered_df = working_df.copy()
+    return working_df
 
-    # =================================================
-    # 📊 AGGREGATION
-    # =================================================
+
+# -----------------------------------------------------
+# 📶 DISTRIBUTION (binned histogram + summary quantiles)
+# -----------------------------------------------------
+def _histogram_edges(values, bins):
+    if bins:
+        return np.histogram_bin_edges(values, bins=int(bins))
+
+    edges = np.histogram_bin_edges(values, bins="auto")
+    if len(edges) > MAX_HISTOGRAM_BINS + 1:
+        edges = np.histogram_bin_edges(values, bins=MAX_HISTOGRAM_BINS)
+    return edges
+
+
+def distribution_result(working_df, plan):
+    """
+    Histogram of visualization.x: fixed (visualization.bins) or auto bins
+    for numeric/datetime columns, top categories for the rest.
+    Summary statistics go to result_df.attrs["statistics"].
+    """
+    viz = plan.get("visualization") or {}
+    col = viz.get("x")
+    series = working_df[col]
+    summary = {"column": col, "rows": len(series), "missing": int(series.isna().sum())}
+
+    is_datetime = is_datetime64_any_dtype(series)
+    if is_datetime:
+        values = series.dropna().astype("int64").to_numpy()
+    elif is_numeric_dtype(series) and not is_bool_dtype(series):
+        values = series.dropna().to_numpy(dtype=float)
+    else:
+        values = None
+
+    # Categorical / text columns: top categories, the rest folded into one bar
+    if values is None:
+        counts = series.value_counts()
+        # Categoricals list every category, including ones filtered away
+        counts = counts[counts > 0]
+        top = counts.head(MAX_CATEGORY_BARS)
+        result_df = pd.DataFrame({col: top.index.astype(str), "count": top.to_numpy()})
+        if len(counts) > MAX_CATEGORY_BARS:
+            result_df.loc[len(result_df)] = ["(other)", int(counts.iloc[MAX_CATEGORY_BARS:].sum())]
+        summary["distinct"] = int(len(counts))
+        result_df.attrs["statistics"] = summary
+        return result_df
+
+    if len(values):
+        counts, edges = np.histogram(values, bins=_histogram_edges(values, viz.get("bins")))
+        points = {"min": values.min(), "max": values.max()}
+        points.update({
+            f"p{int(q * 100)}": v
+            for q, v in zip(SUMMARY_QUANTILES, np.quantile(values, SUMMARY_QUANTILES))
+        })
+    else:
+        counts, edges, points = np.array([], dtype=int), np.array([]), {}
+
+    if is_datetime:
+        unit = np.datetime_data(series.dtype)[0]
+        edges = pd.to_datetime(edges.astype("int64"), unit=unit)
+        summary.update({k: pd.Timestamp(int(v), unit=unit) for k, v in points.items()})
+    else:
+        summary.update({k: float(v) for k, v in points.items()})
+        summary["mean"] = float(values.mean()) if len(values) else None
+        summary["std"] = float(values.std(ddof=1)) if len(values) > 1 else None
+
+    result_df = pd.DataFrame({
+        "bin_start": edges[:-1],
+        "bin_end": edges[1:],
+        "count": counts
+    })
+    result_df.attrs["statistics"] = summary
+    return result_df
+
+
+# -----------------------------------------------------
+# 🔗 CORRELATION (coefficients + downsampled scatter)
+# -----------------------------------------------------
+def correlation_result(working_df, plan):
+    """
+    Pearson and Spearman coefficients of visualization.x vs .y over all
+    rows, plus a random sample of at most SCATTER_SAMPLE_ROWS points.
+    """
+    viz = plan.get("visualization") or {}
+    x, y, color = viz.get("x"), viz.get("y"), viz.get("color")
+
+    pairs = pd.DataFrame({
+        col: working_df[col] if is_numeric_dtype(working_df[col]) else _coerce_numeric(working_df[col])
+        for col in dict.fromkeys([x, y])
+    }).dropna()
+
+    n = len(pairs)
+    ranks = pairs.rank()  # Spearman = Pearson on average ranks (no scipy needed)
+    pearson = pairs[x].corr(pairs[y]) if n > 1 else np.nan
+    spearman = ranks[x].corr(ranks[y]) if n > 1 else np.nan
+    statistics = {
+        "x": x,
+        "y": y,
+        "rows": n,
+        # Undefined (e.g. a constant column) → None, which stays valid JSON
+        "pearson": None if pd.isna(pearson) else float(pearson),
+        "spearman": None if pd.isna(spearman) else float(spearman)
+    }
+
+    columns = list(dict.fromkeys([x, y] + ([color] if color in working_df.columns else [])))
+    sample_index = pairs.index
+    if n > SCATTER_SAMPLE_ROWS:
+        sample_index = pairs.sample(SCATTER_SAMPLE_ROWS, random_state=42).index.sort_values()
+
+    result_df = working_df.loc[sample_index, columns].reset_index(drop=True)
+    result_df[x] = pairs.loc[sample_index, x].to_numpy()
+    result_df[y] = pairs.loc[sample_index, y].to_numpy()
+
+    statistics["sample_rows"] = len(result_df)
+    result_df.attrs["statistics"] = statistics
+    return result_df
+
+
+# -----------------------------------------------------
+# 📊 AGGREGATION
+# -----------------------------------------------------
+def aggregate_plan(working_df, plan):
     metrics = plan.get("metrics", [])
     group_by = plan.get("group_by", [])
 
+    # Computed server-side so the response never carries every row
+    analysis_type = plan.get("analysis_type")
+    if analysis_type == "distribution" and (plan.get("visualization") or {}).get("x"):
+        return distribution_result(working_df, plan)
+    if analysis_type == "correlation" and (plan.get("visualization") or {}).get("y"):
+        return correlation_result(working_df, plan)
+
+    working_df = bucket_time(working_df, plan)
+
     # 🔥 CRITICAL FIX: "HOW MANY X" → DISTINCT COUNT
     # --------------------------------------------------
 # 🔥 FIX: "HOW MANY RECORDS / STUDENTS" → ROW COUNT
@@ -86,7 +297,7 @@ def execute_plan(df, plan):
         count_col = metrics[0]["column"]
 
         # If column is NOT an identifier, count rows instead
-        if working_df[count_col].dtype != "object":
+        if storage_dtype(working_df[count_col].dtype) != "object":
             result_df = pd.DataFrame({
                 "count": [len(working_df)]
             })
@@ -102,10 +313,20 @@ def execute_plan(df, plan):
         for m in metrics:
             agg_map[m["column"]] = m["operation"]
 
+        # Encoded strings aggregate as the strings they hold (unordered
+        # categoricals reject min/max)
+        decoded = {
+            col: working_df[col].astype(storage_dtype(working_df[col].dtype))
+            for col, op in agg_map.items()
+            if op != "count" and isinstance(working_df[col].dtype, pd.CategoricalDtype)
+        }
+        if decoded:
+            working_df = working_df.assign(**decoded)
+
         if agg_map:
             result_df = (
                 working_df
-                .groupby(group_by)
+                .groupby(group_by, observed=True)
                 .agg(agg_map)
                 .reset_index()
             )
@@ -115,6 +336,45 @@ def execute_plan(df, plan):
     else:
         result_df = working_df.copy()
 
+    return result_df
+
+
+# -----------------------------------------------------
+# 🔝 PARTIAL TOP-N (raw-row plans)
+# -----------------------------------------------------
+def top_n_rows(df, plan):
+    """
+    Rows that can reach finalize_result's sorted top-N, found by a
+    partial selection instead of a full sort. Ties at the cut-off are
+    all kept in their original order, so the final sort + head is
+    unchanged. None when the sort column cannot be selected on.
+    """
+    by = plan["sort"]["by"]
+    n = int(plan["visualization"]["top_n"])
+    values = df[by]
+
+    if is_bool_dtype(values) or not (is_numeric_dtype(values) or is_datetime64_any_dtype(values)):
+        return None
+    if len(df) <= n:
+        return df
+
+    descending = plan["sort"].get("order", "asc") != "asc"
+    top = values.nlargest(n) if descending else values.nsmallest(n)
+
+    # Fewer non-null values than n: the full sort would pad with null rows
+    if len(top) < n:
+        return df
+
+    cutoff = top.iloc[-1]
+    return df[values >= cutoff] if descending else df[values <= cutoff]
+
+
+# -----------------------------------------------------
+# 🔀 SORT, TOP-N AND VISUALIZATION
+# -----------------------------------------------------
+def finalize_result(result_df, plan, original_filtered_df=None):
+    metrics = plan.get("metrics", [])
+
     # =================================================
     # 🔀 SORTING
     # =================================================
@@ -122,9 +382,11 @@ def execute_plan(df, plan):
     if sort_cfg and sort_cfg.get("by"):
         by_col = sort_cfg["by"]
         if by_col in result_df.columns:
+            # Stable sort: ties keep group order whatever the column encoding
             result_df = result_df.sort_values(
                 by=by_col,
-                ascending=sort_cfg.get("order", "asc") == "asc"
+                ascending=sort_cfg.get("order", "asc") == "asc",
+                kind="stable"
             )
 
     # =================================================
@@ -137,6 +399,15 @@ def execute_plan(df, plan):
     if user_intent.get("focus") != "both" and top_n:
         result_df = result_df.head(int(top_n))
 
+    # Trends read left to right in time, whatever the ranking sort was
+    x_col = viz.get("x")
+    if (
+        plan.get("analysis_type") == "trend"
+        and x_col in result_df.columns
+        and is_datetime64_any_dtype(result_df[x_col])
+    ):
+        result_df = result_df.sort_values(by=x_col, kind="stable")
+
     # =================================================
     # 📈 VISUALIZATION
     # =================================================
@@ -169,7 +440,45 @@ def execute_plan(df, plan):
         elif viz_type == "scatter" and x and y:
             fig = px.scatter(result_df, x=x, y=y, color=viz.get("color"))
 
+        elif viz_type == "histogram" and "bin_start" in result_df.columns:
+            fig = px.bar(result_df, x="bin_start", y="count")
+
+        elif viz_type == "histogram" and x in result_df.columns and "count" in result_df.columns:
+            fig = px.bar(result_df, x=x, y="count")
+
         elif viz_type == "histogram" and x:
             fig = px.histogram(result_df, x=x, color=viz.get("color"))
 
     return result_df, fig, original_filtered_df
+
+
+# -----------------------------------------------------
+# ⚙️ MAIN EXECUTION ENGINE
+# -----------------------------------------------------
+def execute_plan(df, plan, cancel_token=None, cube=None, physical=None):
+    """
+    physical (from the optimizer) supplies the filter order and may
+    short-circuit provably empty plans; None runs the plan as written.
+    """
+    strategy = physical["strategy"] if physical else None
+
+    # Plans over cube dimensions are answered without scanning raw rows
+    if cube is not None and strategy != "empty":
+        result_df = cube.answer(plan)
+        if result_df is not None:
+            return finalize_result(result_df, plan)
+
+    if strategy == "empty":
+        working_df = df.head(0)
+    else:
+        filters = physical["filters"] if physical else plan.get("filters", [])
+        working_df = apply_filters(df, filters, cancel_token)
+
+    # Save filtered data (for explainer / dual intent)
+    original_filtered_df = working_df.copy()
+    _checkpoint(cancel_token)
+
+    result_df = aggregate_plan(working_df, plan)
+    _checkpoint(cancel_token)
+
+    return finalize_result(result_df, plan, original_filtered_df)
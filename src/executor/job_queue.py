@@ -0,0 +1,104 @@
+import asyncio
+import itertools
+import time
+import uuid
+
+from utils.metrics import metrics
+
+# Lower rank runs first: interactive questions jump ahead of batch jobs
+JOB_PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+# -----------------------------------------------------
+# 📬 PRIORITY JOB QUEUE
+# -----------------------------------------------------
+class JobQueue:
+    """
+    Runs submitted analyses on a fixed number of async workers, highest
+    priority first (FIFO within a priority), recording status and
+    results in a JobStore.
+    """
+
+    def __init__(self, store, workers: int = 2):
+        self.store = store
+        self.workers = workers
+        self._queue = None
+        self._tasks = []
+        self._sequence = itertools.count()
+        self._queued = {name: 0 for name in JOB_PRIORITIES}
+        self._running = 0
+
+    def _publish(self):
+        for name, count in self._queued.items():
+            metrics.set_gauge(f"jobs.queued.{name}", count)
+        metrics.set_gauge("jobs.running", self._running)
+
+    def start(self):
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        self._publish()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, run, question: str, dataset_id: str = None,
+               priority: str = "interactive") -> str:
+        """
+        Queue run (a no-argument coroutine function returning a
+        JSON-ready dict) and return the job id.
+        """
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(
+                f"Invalid priority: {priority}. Use one of {sorted(JOB_PRIORITIES)}"
+            )
+
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, priority, question, dataset_id)
+
+        self._queue.put_nowait((
+            JOB_PRIORITIES[priority],
+            next(self._sequence),
+            job_id,
+            priority,
+            run,
+            time.perf_counter()
+        ))
+        self._queued[priority] += 1
+        metrics.increment(f"jobs.submitted.{priority}")
+        self._publish()
+        return job_id
+
+    async def _worker(self):
+        while True:
+            _, _, job_id, priority, run, enqueued = await self._queue.get()
+
+            self._queued[priority] -= 1
+            self._running += 1
+            self._publish()
+            metrics.observe(
+                f"jobs.queue_wait_seconds.{priority}", time.perf_counter() - enqueued
+            )
+
+            started = time.perf_counter()
+            self.store.mark_running(job_id)
+            try:
+                self.store.complete(job_id, await run())
+                metrics.increment("jobs.completed")
+            except asyncio.CancelledError:
+                self.store.fail(job_id, "Cancelled during shutdown")
+                raise
+            except Exception as e:
+                # HTTPExceptions carry their message in .detail
+                self.store.fail(job_id, str(getattr(e, "detail", None) or e))
+                metrics.increment("jobs.failed")
+            finally:
+                self._running -= 1
+                self._publish()
+                metrics.observe(
+                    f"jobs.run_seconds.{priority}", time.perf_counter() - started
+                )
+                self._queue.task_done()
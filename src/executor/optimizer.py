@@ -0,0 +1,348 @@
+import math
+
+import pandas as pd
+
+from executor.executor import (
+    MAX_CATEGORY_BARS,
+    MAX_HISTOGRAM_BINS,
+    MAX_TIME_BUCKETS,
+    SCATTER_SAMPLE_ROWS,
+    filter_value,
+)
+
+RANGE_OPERATORS = {">", "<", ">=", "<="}
+
+# Textbook guess for a range predicate on a column without bounds
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+
+
+# -----------------------------------------------------
+# 🧮 PLAN SHAPE (mirrors aggregate_plan's dispatch)
+# -----------------------------------------------------
+def plan_shape(plan: dict) -> str:
+    viz = plan.get("visualization") or {}
+    metrics = plan.get("metrics", [])
+    group_by = plan.get("group_by", [])
+    analysis_type = plan.get("analysis_type")
+
+    if analysis_type == "distribution" and viz.get("x"):
+        return "distribution"
+    if analysis_type == "correlation" and viz.get("y"):
+        return "correlation"
+    if not group_by and len(metrics) == 1 and metrics[0]["operation"] == "count":
+        return "count"
+    if group_by:
+        return "grouped" if metrics else "distinct"
+    return "rows"
+
+
+def projected_columns(plan: dict, columns: list):
+    """
+    Columns the filter + aggregate stage reads, in dataset order, or None
+    when the result carries whole rows and nothing can be pruned.
+    """
+    shape = plan_shape(plan)
+    viz = plan.get("visualization") or {}
+
+    if shape == "distribution":
+        needed = {viz["x"]}
+    elif shape == "correlation":
+        needed = {viz.get("x"), viz["y"], viz.get("color")}
+    elif shape in ("count", "grouped"):
+        needed = set(plan.get("group_by", [])) | {m["column"] for m in plan["metrics"]}
+    else:
+        return None
+
+    needed |= {f["column"] for f in plan.get("filters", [])}
+    return [col for col in columns if col in needed]
+
+
+# -----------------------------------------------------
+# 🎯 FILTER SELECTIVITY (from ingest statistics)
+# -----------------------------------------------------
+def _null_share(stats: dict) -> float:
+    total = stats["non_null"] + stats["missing"]
+    return stats["missing"] / total if total else 0.0
+
+
+def _is_datetime(stats: dict) -> bool:
+    return stats["dtype"].startswith("datetime")
+
+
+def _range_bound(stats: dict, value):
+    """The filter value as apply_filters compares it, or None."""
+    try:
+        if _is_datetime(stats):
+            return pd.Timestamp(str(value))
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _equality_share(stats: dict, values: list):
+    """
+    Share of rows equal to one of values. Exactly 0 only when none of
+    them is among the column's distinct values.
+    """
+    distinct = stats["distinct"]
+    present = len(values)
+
+    # Datetime equality parses strings, so membership is not conclusive
+    if not _is_datetime(stats):
+        try:
+            present = sum(1 for v in set(values) if v in distinct)
+        except TypeError:
+            pass
+
+    return min(present / max(len(distinct), 1), 1.0) * (1 - _null_share(stats))
+
+
+def _range_share(stats: dict, op: str, bound):
+    """(share, verdict): verdict "none"/"all" when the bounds decide it."""
+    low, high = stats.get("min"), stats.get("max")
+    not_null = 1 - _null_share(stats)
+
+    if bound is None or low is None:
+        return DEFAULT_RANGE_SELECTIVITY * not_null, None
+
+    try:
+        below = 0.5 if high == low else (bound - low) / (high - low)
+        if op == ">":
+            none, every = bound >= high, bound < low
+        elif op == ">=":
+            none, every = bound > high, bound <= low
+        elif op == "<":
+            none, every = bound <= low, bound > high
+        else:
+            none, every = bound < low, bound >= high
+    except TypeError:
+        # e.g. tz-naive bound vs tz-aware column; apply_filters decides
+        return DEFAULT_RANGE_SELECTIVITY * not_null, None
+
+    if none:
+        return 0.0, "none"
+    if every:
+        # Null rows never pass a range filter
+        return not_null, "all" if not_null == 1 else None
+
+    below = min(max(float(below), 0.0), 1.0)
+    share = 1 - below if op in (">", ">=") else below
+    return share * not_null, None
+
+
+def filter_share(f: dict, stats: dict):
+    """
+    (estimated share of rows kept, verdict). verdict is "none" when the
+    filter provably keeps no row, "all" when it provably keeps every row.
+    """
+    op = f["operator"]
+    val = filter_value(f)
+
+    if op in RANGE_OPERATORS:
+        return _range_share(stats, op, _range_bound(stats, val))
+
+    values = val if isinstance(val, list) else [val]
+    # isin() matches null rows for a null in the list; == / != never do
+    if op == "in" and any(pd.isna(v) for v in values if not isinstance(v, list)):
+        return 1.0, None
+
+    share = _equality_share(stats, values)
+    if op == "!=":
+        if share == 0:
+            return 1.0, "all" if not _is_datetime(stats) else None
+        return 1 - share, None
+
+    if share == 0 and not _is_datetime(stats):
+        return 0.0, "none"
+    return share, None
+
+
+def _contradiction(filters: list, stats: dict):
+    """
+    Reason why a column's filters can never hold together, or None.
+    Only combinations apply_filters evaluates identically are compared.
+    """
+    allowed, excluded = None, set()
+    low, high = None, None
+
+    for f in filters:
+        op = f["operator"]
+        val = filter_value(f)
+        try:
+            if op == "==":
+                allowed = {val} if allowed is None else allowed & {val}
+            elif op == "in":
+                values = set(val if isinstance(val, list) else [val])
+                allowed = values if allowed is None else allowed & values
+            elif op == "!=":
+                excluded.add(val)
+        except TypeError:
+            continue
+
+        bound = _range_bound(stats, val) if op in RANGE_OPERATORS else None
+        if bound is None:
+            continue
+        strict = op in (">", "<")
+        if op in (">", ">=") and (low is None or bound > low[0] or (bound == low[0] and strict)):
+            low = (bound, strict)
+        if op in ("<", "<=") and (high is None or bound < high[0] or (bound == high[0] and strict)):
+            high = (bound, strict)
+
+    column = filters[0]["column"]
+    if allowed is not None and not (allowed - excluded):
+        return f"no value of {column} satisfies its equality filters"
+
+    try:
+        if low and high and (low[0] > high[0] or (low[0] == high[0] and (low[1] or high[1]))):
+            return f"empty range on {column}"
+    except TypeError:
+        pass
+
+    return None
+
+
+# -----------------------------------------------------
+# 📐 ROW ESTIMATES
+# -----------------------------------------------------
+def _group_count(plan: dict, profile: dict) -> int:
+    groups = 1
+    for col in plan.get("group_by", []):
+        stats = profile[col]
+        distinct = len(stats["distinct"])
+        if _is_datetime(stats):
+            distinct = min(distinct, MAX_TIME_BUCKETS)
+        groups *= max(distinct, 1)
+    return groups
+
+
+def _result_rows(plan: dict, profile: dict, filtered: int) -> int:
+    """Rows the finalized result is expected to have."""
+    shape = plan_shape(plan)
+    viz = plan.get("visualization") or {}
+
+    if filtered == 0:
+        return 1 if shape == "count" else 0
+
+    if shape == "distribution":
+        stats = profile[viz["x"]]
+        if "min" in stats:
+            rows = viz.get("bins") or MAX_HISTOGRAM_BINS
+        else:
+            rows = min(len(stats["distinct"]), MAX_CATEGORY_BARS + 1)
+    elif shape == "correlation":
+        rows = min(filtered, SCATTER_SAMPLE_ROWS)
+    elif shape == "count":
+        rows = 1
+    elif shape in ("grouped", "distinct"):
+        rows = min(filtered, _group_count(plan, profile))
+    else:
+        rows = filtered
+
+    top_n = viz.get("top_n")
+    if top_n and (plan.get("user_intent") or {}).get("focus") != "both":
+        rows = min(rows, int(top_n))
+    return rows
+
+
+def _is_top_n(plan: dict, profile: dict) -> bool:
+    viz = plan.get("visualization") or {}
+    by = (plan.get("sort") or {}).get("by")
+    return (
+        plan_shape(plan) == "rows"
+        and bool(viz.get("top_n"))
+        and (plan.get("user_intent") or {}).get("focus") != "both"
+        and by in profile
+        and "min" in profile[by]
+    )
+
+
+def _sort_cost(rows: float, keep: float) -> float:
+    return rows * math.log2(max(keep, 2))
+
+
+# -----------------------------------------------------
+# 🧠 COST-BASED OPTIMIZER
+# -----------------------------------------------------
+def optimize_plan(plan: dict, profile: dict, rows: int, cube=None, cached: bool = False) -> dict:
+    """
+    Physical plan for a validated plan, from the per-column statistics
+    collected at ingest (distinct values, null share, min/max):
+
+    - filters that provably keep every row are dropped; the rest run most
+      selective column first (filters on one column keep their order,
+      since range filters coerce the column for the filters after them)
+    - a filter or filter combination that can never hold → "empty"
+    - the aggregate stage reads only the columns it needs
+    - strategy: the cheapest of "cached", "cube", "topn" and "scan",
+      costed in rows touched
+    """
+    by_column = {}
+    for f in plan.get("filters", []):
+        by_column.setdefault(f["column"], []).append(f)
+
+    groups, dropped, reason = [], [], None
+    for column, column_filters in by_column.items():
+        stats = profile[column]
+        kept, share = [], 1.0
+
+        for f in column_filters:
+            f_share, verdict = filter_share(f, stats)
+            if verdict == "none" and reason is None:
+                reason = f"{column} {f['operator']} {filter_value(f)!r} matches no row"
+            if verdict == "all":
+                dropped.append(f)
+                continue
+            kept.append({**f, "selectivity": round(f_share, 6)})
+            share *= f_share
+
+        if reason is None:
+            reason = _contradiction(column_filters, stats)
+        if kept:
+            groups.append((share, kept))
+
+    groups.sort(key=lambda group: group[0])
+    filters = [f for _, kept in groups for f in kept]
+
+    # Rows entering each filter, independence assumed between columns
+    filter_cost, remaining = 0.0, float(rows)
+    for f in filters:
+        filter_cost += remaining
+        remaining *= f["selectivity"]
+
+    filtered = 0 if reason else int(round(remaining))
+    result = _result_rows(plan, profile, filtered)
+
+    columns = projected_columns(plan, list(profile))
+    scan_read = rows * (len(columns) if columns else len(profile)) / max(len(profile), 1)
+    sorted_rows = plan_shape(plan) == "rows" and (plan.get("sort") or {}).get("by")
+
+    candidates = {"scan": scan_read + filter_cost + (_sort_cost(filtered, filtered) if sorted_rows else filtered)}
+    if _is_top_n(plan, profile):
+        top_n = int(plan["visualization"]["top_n"])
+        candidates["topn"] = scan_read + filter_cost + filtered + _sort_cost(top_n, top_n)
+    if cube is not None:
+        cuboid_rows = cube.answer_cost(plan)
+        if cuboid_rows is not None:
+            candidates["cube"] = float(cuboid_rows)
+    if cached:
+        candidates["cached"] = float(result)
+
+    if reason:
+        strategy, scanned = "empty", 0
+    else:
+        strategy = min(candidates, key=candidates.get)
+        scanned = {"cached": 0, "cube": candidates.get("cube")}.get(strategy, rows)
+
+    return {
+        "strategy": strategy,
+        "reason": reason,
+        "filters": filters,
+        "dropped_filters": dropped,
+        "columns": columns,
+        "candidates": {name: round(cost, 1) for name, cost in candidates.items()},
+        "estimated_rows": {
+            "scanned": int(scanned),
+            "filtered": filtered,
+            "result": result
+        }
+    }
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils.metrics import metrics
+
+
+class ExecutionTimeoutError(Exception):
+    """Raised when a plan exceeds the configured time limit."""
+
+
+class ExecutionCancelled(Exception):
+    """Raised inside a worker once its execution has been cancelled."""
+
+
+# -----------------------------------------------------
+# 🛑 COOPERATIVE CANCELLATION
+# -----------------------------------------------------
+class CancelToken:
+    """
+    Checked by the executor between stages. Thread workers cannot be
+    interrupted, so a timed-out plan stops at the next checkpoint.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise ExecutionCancelled("Execution was cancelled")
+
+
+# -----------------------------------------------------
+# 🧵 BOUNDED WORKER POOL
+# -----------------------------------------------------
+class ExecutionPool:
+    """
+    Runs CPU-bound pandas work off the event loop with a per-call
+    time limit.
+
+    mode="thread"  → shared memory, cooperative cancellation
+    mode="process" → true parallelism, arguments are pickled
+    """
+
+    def __init__(self, max_workers: int = 4, mode: str = "thread",
+                 time_limit_seconds: float = 30):
+        if mode not in {"thread", "process"}:
+            raise ValueError(f"Invalid execution pool mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.time_limit_seconds = time_limit_seconds
+
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="executor"
+            )
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        metrics.set_gauge("executor.max_workers", max_workers)
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("executor.in_flight", self._in_flight)
+        metrics.set_gauge(
+            "executor.queued", max(0, self._in_flight - self.max_workers)
+        )
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                metrics.increment("executor.saturated")
+            self._in_flight += 1
+            self._publish()
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._publish()
+
+    async def run(self, fn, *args, cancellable: bool = False,
+                  time_limit: float = None, **kwargs):
+        """
+        Execute fn(*args, **kwargs) in the pool and await its result.
+
+        When cancellable is set (thread mode only) a CancelToken is passed
+        as the `cancel_token` keyword so fn can stop at its checkpoints.
+        """
+        limit = time_limit or self.time_limit_seconds
+        token = None
+
+        if cancellable and self.mode == "thread":
+            token = CancelToken()
+            kwargs["cancel_token"] = token
+
+        loop = asyncio.get_running_loop()
+        self._acquire()
+        started = time.perf_counter()
+
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future, loop=loop),
+                timeout=limit
+            )
+        except asyncio.TimeoutError:
+            future.cancel()
+            if token:
+                token.cancel()
+            metrics.increment("executor.timeouts")
+            raise ExecutionTimeoutError(
+                f"Execution exceeded the time limit of {limit:g} seconds"
+            )
+        finally:
+            metrics.observe(
+                "executor.duration_seconds", time.perf_counter() - started
+            )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
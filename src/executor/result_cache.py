@@ -0,0 +1,188 @@
+import threading
+from collections import OrderedDict
+
+from executor.executor import (
+    apply_filters,
+    aggregate_plan,
+    finalize_result,
+    top_n_rows,
+    _checkpoint,
+)
+from executor.aggregates import (
+    is_mergeable,
+    compute_partials,
+    merge_partials,
+    aggregate_from_partials,
+)
+from schemas.plan import Plan
+
+
+# -----------------------------------------------------
+# 📊 AGGREGATE COMPUTATION (CACHE AWARE)
+# -----------------------------------------------------
+def run_physical_plan(df, plan, physical=None, cancel_token=None, cube=None):
+    """
+    Filter + aggregate stage following the optimizer's physical plan
+    (filter order, projection, strategy). Without one: cube if it can
+    answer, else a scan of the plan as written.
+
+    Returns (aggregated_df, partials, rows) where rows counts what was
+    actually read ("scanned") and kept by the filters ("filtered").
+    """
+    strategy = physical["strategy"] if physical else None
+
+    if cube is not None and strategy in (None, "cube", "cached"):
+        aggregated = cube.answer(plan)
+        if aggregated is not None:
+            return aggregated, None, {"scanned": cube.answer_cost(plan), "filtered": None}
+
+    if physical is None:
+        filters = plan.get("filters", [])
+    else:
+        filters = physical["filters"]
+        if physical["columns"]:
+            df = df[physical["columns"]]
+
+    if strategy == "empty":
+        working_df, scanned = df.head(0), 0
+    else:
+        working_df, scanned = apply_filters(df, filters, cancel_token), len(df)
+    _checkpoint(cancel_token)
+
+    rows = {"scanned": scanned, "filtered": len(working_df)}
+
+    if strategy == "topn":
+        top = top_n_rows(working_df, plan)
+        if top is not None:
+            return top, None, rows
+
+    if is_mergeable(working_df, plan):
+        partials = compute_partials(working_df, plan)
+        return aggregate_from_partials(partials, plan), partials, rows
+
+    return aggregate_plan(working_df, plan), None, rows
+
+
+def compute_aggregate(df, plan, cancel_token=None, cube=None, physical=None):
+    """
+    Filter + aggregate stage of the executor.
+
+    Returns (aggregated_df, partials). partials is set for mergeable
+    group_by plans so the result can be maintained on append.
+    """
+    aggregated, partials, _ = run_physical_plan(df, plan, physical, cancel_token, cube)
+    return aggregated, partials
+
+
+def explain_aggregate(df, plan, physical, cancel_token=None, cube=None, aggregated=None):
+    """
+    Actual row counts of a physical plan. aggregated is the cached result
+    when the plan is served from the result cache.
+    """
+    if aggregated is not None:
+        rows = {"scanned": 0, "filtered": None}
+    else:
+        aggregated, _, rows = run_physical_plan(df, plan, physical, cancel_token, cube)
+
+    result_df, _, _ = finalize_result(aggregated, plan)
+    return {**rows, "result": len(result_df)}
+
+
+# -----------------------------------------------------
+# 🗄 PER-DATASET RESULT CACHE
+# -----------------------------------------------------
+class ResultCache:
+    """
+    Aggregated (pre-sort, pre-top-n) results and their explanations,
+    keyed by the compiled Plan's canonical key.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def copy(self) -> "ResultCache":
+        # Entries are copied: apply_append and put_insight replace their values
+        clone = ResultCache(self.max_entries)
+        with self._lock:
+            clone._entries = OrderedDict((key, dict(entry)) for key, entry in self._entries.items())
+        return clone
+
+    def __contains__(self, plan: Plan) -> bool:
+        return plan.key in self._entries
+
+    def get(self, plan: Plan):
+        with self._lock:
+            entry = self._entries.get(plan.key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(plan.key)
+            return entry["aggregated"]
+
+    def get_by_key(self, key: str):
+        """Returns (plan, aggregated) for a result id, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry["plan"], entry["aggregated"]
+
+    def put(self, plan: Plan, aggregated, partials=None):
+        with self._lock:
+            self._entries[plan.key] = {
+                "plan": plan,
+                "aggregated": aggregated,
+                "partials": partials,
+                "insight": None
+            }
+            self._entries.move_to_end(plan.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_insight(self, plan: Plan):
+        with self._lock:
+            entry = self._entries.get(plan.key)
+            return entry["insight"] if entry is not None else None
+
+    def put_insight(self, plan: Plan, insight: str):
+        # Only explains a result that is still cached (and so current)
+        with self._lock:
+            entry = self._entries.get(plan.key)
+            if entry is not None:
+                entry["insight"] = insight
+
+    def apply_append(self, new_rows) -> dict:
+        """
+        Bring cached results up to date after rows were appended.
+
+        Plans whose filters reject every new row are untouched, mergeable
+        aggregates are updated from the new rows alone and everything
+        else affected is invalidated.
+        """
+        updated, invalidated = 0, 0
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                plan = entry["plan"].as_dict()
+                new_filtered = apply_filters(new_rows, plan.get("filters", []))
+
+                if new_filtered.empty:
+                    continue
+
+                if entry["partials"] is not None and is_mergeable(new_filtered, plan):
+                    partials = merge_partials(
+                        entry["partials"], compute_partials(new_filtered, plan)
+                    )
+                    entry["partials"] = partials
+                    entry["aggregated"] = aggregate_from_partials(partials, plan)
+                    entry["insight"] = None
+                    updated += 1
+                else:
+                    del self._entries[key]
+                    invalidated += 1
+
+        return {"updated": updated, "invalidated": invalidated}
@@ -0,0 +1,84 @@
+import re
+import warnings
+
+import pandas as pd
+
+from ingest.encoding import _is_string_column
+
+# A value must spell out day, month and year: dateutil alone also accepts
+# "January", "Monday" or "1/2" (filling the gaps with year 1 / today)
+_FULL_DATE = re.compile(
+    r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"              # 2003-02-24
+    r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"           # 2/24/2003, 05-07-03
+    r"|\d{1,2}\s+[A-Za-z]{3,9}\.?,?\s+\d{4}"       # 24 Feb 2003
+    r"|[A-Za-z]{3,9}\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}"  # Feb 24, 2003
+)
+
+# Parsed years outside this range mean the values were not dates
+MIN_YEAR = 1800
+MAX_YEAR = 2200
+
+
+# -----------------------------------------------------
+# 📅 DATETIME PARSING (mixed formats, parsed once per distinct value)
+# -----------------------------------------------------
+def to_datetime_column(series: pd.Series) -> pd.Series:
+    """
+    Parse a string column whose values may mix formats
+    ("2/24/2003 0:00", "05-07-2003 00:00"). Each distinct value is parsed
+    once and broadcast back through its factorized code.
+    """
+    codes, uniques = pd.factorize(series)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.DatetimeIndex(
+            pd.to_datetime(pd.Series(uniques, dtype=object), format="mixed", errors="coerce")
+        )
+
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _looks_like_datetime(series: pd.Series, sample_rows: int,
+                         min_parsed_share: float) -> bool:
+    sample = pd.Series(series.dropna().head(sample_rows).unique())
+    if sample.empty:
+        return False
+
+    # Plain numbers (postal codes, phone numbers) are never dates
+    if pd.to_numeric(sample, errors="coerce").notna().mean() >= min_parsed_share:
+        return False
+
+    if sample.astype(str).str.contains(_FULL_DATE).mean() < min_parsed_share:
+        return False
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parsed = pd.to_datetime(sample, format="mixed", errors="coerce")
+
+    plausible = parsed.dt.year.between(MIN_YEAR, MAX_YEAR)
+    return plausible.mean() >= min_parsed_share
+
+
+def parse_datetimes(df: pd.DataFrame, sample_rows: int = 1000,
+                    min_parsed_share: float = 0.9):
+    """
+    Convert string columns whose sampled values parse as dates to
+    datetime64. Returns (df, report) with the converted columns.
+    """
+    converted = []
+
+    for col in df.columns:
+        series = df[col]
+        if not _is_string_column(series):
+            continue
+        if not _looks_like_datetime(series, sample_rows, min_parsed_share):
+            continue
+
+        if not converted:
+            df = df.copy()
+        df[col] = to_datetime_column(series)
+        converted.append(col)
+
+    return df, {"datetime_columns": converted}
@@ -0,0 +1,82 @@
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+
+# -----------------------------------------------------
+# 🏷 CATEGORICAL ENCODING OF STRING COLUMNS
+# -----------------------------------------------------
+def _is_string_column(series: pd.Series) -> bool:
+    return is_object_dtype(series) or (
+        is_string_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype)
+    )
+
+
+def encode_categoricals(df: pd.DataFrame, max_cardinality: int = 1000,
+                        max_unique_ratio: float = 0.5):
+    """
+    Convert low-cardinality string columns to pandas categoricals.
+
+    Returns (encoded_df, report) where report lists the encoded columns
+    and the deep memory usage before and after.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    encoded = []
+
+    if max_cardinality and len(df):
+        df = df.copy()
+        for col in df.columns:
+            series = df[col]
+            if not _is_string_column(series):
+                continue
+
+            distinct = series.nunique()
+            if distinct <= max_cardinality and distinct / len(df) <= max_unique_ratio:
+                df[col] = series.astype("category")
+                encoded.append(col)
+
+    memory_after = int(df.memory_usage(deep=True).sum())
+
+    return df, {
+        "encoded_columns": encoded,
+        "memory_bytes_before": memory_before,
+        "memory_bytes_after": memory_after
+    }
+
+
+def _sorted_union(left, right):
+    union = left.union(right)
+    try:
+        return union.sort_values()
+    except TypeError:
+        return union
+
+
+def concat_encoded(df: pd.DataFrame, new_rows: pd.DataFrame):
+    """
+    Append rows to an encoded frame without losing the categorical dtypes.
+
+    Categories stay sorted so groupby and sort order match the unencoded
+    strings. Returns (combined_df, encoded_new_rows).
+    """
+    new_rows = new_rows.copy()
+    recoded = {}
+
+    for col in df.columns:
+        dtype = df[col].dtype
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+
+        categories = _sorted_union(
+            dtype.categories, pd.Index(new_rows[col].dropna().unique())
+        )
+        new_rows[col] = pd.Categorical(new_rows[col], categories=categories)
+
+        if not categories.equals(dtype.categories):
+            recoded[col] = df[col].cat.set_categories(categories)
+
+    combined = pd.concat([df, new_rows], ignore_index=True)
+
+    for col, series in recoded.items():
+        combined[col] = pd.concat([series, new_rows[col]], ignore_index=True)
+
+    return combined, new_rows
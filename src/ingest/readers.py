@@ -0,0 +1,254 @@
+import codecs
+import csv
+import gzip
+import hashlib
+import io
+import struct
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+# Peak parse + encode memory per decompressed byte (Arrow buffers, the
+# pandas copy and the categorical re-encode are alive at the same time)
+PARSE_MEMORY_PER_BYTE = 4
+PARSE_MEMORY_PER_COLUMN = 1 << 20
+# Assumed ratio when a compressed payload does not record its size
+ASSUMED_COMPRESSION_RATIO = 5
+# Decompressed bytes held at once while hashing an upload
+HASH_CHUNK_BYTES = 1 << 20
+
+
+# -----------------------------------------------------
+# 🗜 DECOMPRESSION
+# -----------------------------------------------------
+def is_compressed(data: bytes) -> bool:
+    return data.startswith(GZIP_MAGIC) or data.startswith(ZSTD_MAGIC)
+
+
+def decompress(data: bytes) -> bytes:
+    if data.startswith(GZIP_MAGIC):
+        return gzip.decompress(data)
+
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd-compressed uploads require the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+
+    return data
+
+
+def detect_format(data: bytes) -> str:
+    """Format of an (already decompressed) payload."""
+    if data.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if data.startswith(ARROW_FILE_MAGIC) or data.startswith(ARROW_STREAM_MAGIC):
+        return "arrow"
+    return "csv"
+
+
+def _decompressed_chunks(data: bytes, chunk_size: int):
+    """Decompressed content in chunks, never holding all of it at once."""
+    if data.startswith(GZIP_MAGIC):
+        stream = gzip.GzipFile(fileobj=io.BytesIO(data))
+    elif data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd-compressed uploads require the 'zstandard' package")
+        stream = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+    else:
+        yield data
+        return
+
+    with stream:
+        while chunk := stream.read(chunk_size):
+            yield chunk
+
+
+def content_hash(data: bytes, chunk_size: int = HASH_CHUNK_BYTES) -> str:
+    """
+    Dataset id: sha256 of the decompressed content, so the same file
+    gets the same id whether it was uploaded raw or compressed. Runs
+    before the upload is admitted, so it only decompresses chunk_size
+    bytes at a time.
+    """
+    digest = hashlib.sha256()
+    for chunk in _decompressed_chunks(data, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -----------------------------------------------------
+# 📏 MEMORY ESTIMATE (without parsing the payload)
+# -----------------------------------------------------
+def uncompressed_size(data: bytes) -> int:
+    if data.startswith(GZIP_MAGIC) and len(data) >= 4:
+        # ISIZE trailer: uncompressed length mod 2**32
+        isize = struct.unpack("<I", data[-4:])[0]
+        return max(isize, len(data))
+
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is not None:
+            size = zstandard.frame_content_size(data)
+            if size > 0:
+                return size
+        return len(data) * ASSUMED_COMPRESSION_RATIO
+
+    return len(data)
+
+
+def header_columns(data: bytes) -> int:
+    """Column count from the first CSV line (0 for binary formats)."""
+    if data.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            head = f.readline(1 << 16)
+    elif data.startswith(ZSTD_MAGIC) or detect_format(data) != "csv":
+        return 0
+    else:
+        head = data[:1 << 16].split(b"\n", 1)[0]
+    return head.count(b",") + 1
+
+
+def estimate_parse_memory(data: bytes) -> int:
+    """Rough peak bytes needed to parse and encode an upload."""
+    return (
+        uncompressed_size(data) * PARSE_MEMORY_PER_BYTE
+        + header_columns(data) * PARSE_MEMORY_PER_COLUMN
+    )
+
+
+# -----------------------------------------------------
+# 🔤 ENCODING DETECTION
+# -----------------------------------------------------
+def detect_encoding(data: bytes, chunk_size: int = 1 << 20) -> str:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for start in range(0, len(data), chunk_size):
+            decoder.decode(data[start:start + chunk_size])
+        decoder.decode(b"", final=True)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+
+
+# -----------------------------------------------------
+# 📄 CSV (multithreaded Arrow engine, sampled dtypes)
+# -----------------------------------------------------
+def _read_csv(data: bytes, sample_rows: int) -> pd.DataFrame:
+    encoding = detect_encoding(data)
+
+    if pa is None:
+        return pd.read_csv(io.BytesIO(data), encoding=encoding)
+
+    # Pin the sample's string columns so Arrow does not re-type them
+    # (e.g. as timestamps) differently from the default pandas parser
+    sample = pd.read_csv(io.BytesIO(data), encoding=encoding, nrows=sample_rows)
+    string_columns = {
+        col: str
+        for col in sample.columns
+        if not pd.api.types.is_numeric_dtype(sample[col])
+        and not pd.api.types.is_bool_dtype(sample[col])
+    }
+
+    try:
+        return pd.read_csv(
+            io.BytesIO(data),
+            encoding=encoding,
+            engine="pyarrow",
+            dtype=string_columns or None
+        )
+    except Exception:
+        # Types changed after the first block: fall back to the C parser
+        return pd.read_csv(io.BytesIO(data), encoding=encoding)
+
+
+def _read_arrow(data: bytes) -> pd.DataFrame:
+    if pa is None:
+        raise ValueError("Arrow uploads require the 'pyarrow' package")
+
+    if data.startswith(ARROW_FILE_MAGIC):
+        table = pa.ipc.open_file(pa.BufferReader(data)).read_all()
+    else:
+        table = pa.ipc.open_stream(pa.BufferReader(data)).read_all()
+    return table.to_pandas()
+
+
+# -----------------------------------------------------
+# 🏷 HEADER ONLY (column names without parsing rows)
+# -----------------------------------------------------
+def _decompressed_head(data: bytes, size: int) -> bytes:
+    if data.startswith(GZIP_MAGIC):
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            return f.read(size)
+
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("zstd-compressed uploads require the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read(size)
+
+    return data[:size]
+
+
+def read_header(data: bytes, max_bytes: int = 1 << 20) -> list:
+    """
+    Column names of an upload, decompressing only the first max_bytes of
+    a CSV. Uncompressed Parquet / Arrow read just their schema; compressed
+    ones return [] since their schema needs the whole payload decompressed,
+    which only happens once the upload is admitted.
+    """
+    head = _decompressed_head(data, max_bytes)
+    file_format = detect_format(head)
+
+    if file_format != "csv":
+        if pa is None:
+            raise ValueError("Parquet/Arrow uploads require the 'pyarrow' package")
+        if is_compressed(data):
+            return []
+        if file_format == "parquet":
+            return pa.parquet.read_schema(pa.BufferReader(data)).names
+        if data.startswith(ARROW_FILE_MAGIC):
+            return pa.ipc.open_file(pa.BufferReader(data)).schema.names
+        return pa.ipc.open_stream(pa.BufferReader(data)).schema.names
+
+    try:
+        text = head.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        # A multi-byte character may be cut at the end of the chunk
+        text = head.decode(detect_encoding(head[:-4]), errors="ignore")
+    return next(csv.reader(io.StringIO(text)), [])
+
+
+# -----------------------------------------------------
+# 📥 ENTRY POINT
+# -----------------------------------------------------
+def read_dataset(data: bytes, sample_rows: int = 10_000) -> pd.DataFrame:
+    """
+    Parse an uploaded dataset: CSV (optionally gzip/zstd-compressed),
+    Parquet or Arrow IPC, detected from the content itself.
+    """
+    data = decompress(data)
+    file_format = detect_format(data)
+
+    if file_format == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+
+    if file_format == "arrow":
+        return _read_arrow(data)
+
+    return _read_csv(data, sample_rows)
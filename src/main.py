@@ -1,12 +1,51 @@
-from fastapi import FastAPI, UploadFile, File, Form
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 import pandas as pd
 
 from agents.planner import PlannerAgent
 from agents.explainer import ExplainerAgent
-from agents.dataset_analyzer import analyze_dataset
-from executor.executor import execute_plan
-from schemas.plan_validator import validate_plan
+from agents.dataset_analyzer import profile_to_frame
+from executor.approximate import execute_plan_approximate, max_relative_error
+from executor.executor import execute_plan, finalize_result
+from executor.job_queue import JobQueue
+from executor.pool import ExecutionPool, ExecutionTimeoutError
+from executor.result_cache import compute_aggregate, explain_aggregate
+from schemas.plan import Plan
+from schemas.plan_validator import compile_plan
+from ingest.readers import read_dataset, read_header, content_hash, estimate_parse_memory
+from store.dataset_store import Dataset, DatasetStore, appended_dataset_id
+from store.job_store import JobStore
+from store.session_store import Session, SessionStore
+from utils.admission import AdmissionRejected, MemoryAdmission
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+from utils.timing import StageTimer
+from config import (
+    EXECUTOR_POOL_MODE,
+    EXECUTOR_MAX_WORKERS,
+    EXECUTOR_TIME_LIMIT_SECONDS,
+    MAX_DATASETS,
+    CUBE_MAX_CARDINALITY,
+    CATEGORICAL_MAX_CARDINALITY,
+    APPROX_SAMPLE_FRACTION,
+    APPROX_PROGRESSIVE_FRACTIONS,
+    APPROX_TARGET_RELATIVE_ERROR,
+    MEMORY_BUDGET_MB,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_MAX_WAIT_SECONDS,
+    MAX_SESSIONS,
+    SESSION_TTL_SECONDS,
+    JOB_DB_PATH,
+    JOB_WORKERS,
+    JOB_RETENTION_SECONDS,
+    JOB_TIME_LIMIT_SECONDS,
+)
 
 app = FastAPI(title="AI Data Analyst Backend")
 
@@ -19,6 +58,60 @@ app.add_middleware(
 
 planner = PlannerAgent()
 explainer = ExplainerAgent()
+execution_pool = ExecutionPool(
+    max_workers=EXECUTOR_MAX_WORKERS,
+    mode=EXECUTOR_POOL_MODE,
+    time_limit_seconds=EXECUTOR_TIME_LIMIT_SECONDS,
+)
+datasets = DatasetStore(
+    max_datasets=MAX_DATASETS,
+    cube_max_cardinality=CUBE_MAX_CARDINALITY,
+    categorical_max_cardinality=CATEGORICAL_MAX_CARDINALITY,
+)
+sessions = SessionStore(
+    max_sessions=MAX_SESSIONS,
+    ttl_seconds=SESSION_TTL_SECONDS,
+)
+coalescer = SingleFlight("analyze")
+plan_coalescer = SingleFlight("analyze.plan")
+job_store = JobStore(JOB_DB_PATH, retention_seconds=JOB_RETENTION_SECONDS)
+job_queue = JobQueue(job_store, workers=JOB_WORKERS)
+admission = MemoryAdmission(
+    budget_bytes=MEMORY_BUDGET_MB << 20,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_wait_seconds=ADMISSION_MAX_WAIT_SECONDS,
+)
+
+
+@app.exception_handler(AdmissionRejected)
+def admission_rejected(request, exc: AdmissionRejected):
+    # Larger than the whole budget: retrying cannot help
+    if exc.retry_after is None:
+        return JSONResponse(status_code=413, content={"detail": str(exc)})
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.on_event("startup")
+async def start_job_workers():
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_pool():
+    await job_queue.stop()
+    execution_pool.shutdown()
+    job_store.close()
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    try:
+        return await execution_pool.run(fn, *args, **kwargs)
+    except ExecutionTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
 
 
 def is_dataset_info_query(question: str) -> bool:
@@ -34,38 +127,589 @@ def is_dataset_info_query(question: str) -> bool:
     return any(k in question.lower() for k in keywords)
 
 
-@app.post("/analyze")
-async def analyze(
-    question: str = Form(...),
-    file: UploadFile = File(...)
+async def read_upload(data: bytes) -> pd.DataFrame:
+    try:
+        return await run_in_threadpool(read_dataset, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def ingest_bytes(data: bytes, dataset_id: str) -> Dataset:
+    dataset = datasets.get(dataset_id)
+    if dataset is None:
+        # Parsing and encoding are admitted against the memory budget
+        async with admission.reserve(estimate_parse_memory(data)):
+            df = await read_upload(data)
+            dataset = await run_in_threadpool(datasets.put, dataset_id, df)
+
+    return dataset
+
+
+async def ingest_upload(file: UploadFile) -> Dataset:
+    data = await file.read()
+    dataset_id = await run_in_threadpool(content_hash, data)
+    return await ingest_bytes(data, dataset_id)
+
+
+def get_dataset(dataset_id: str) -> Dataset:
+    dataset = datasets.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown dataset_id: {dataset_id}"
+        )
+    return dataset
+
+
+@app.post("/datasets")
+async def upload_dataset(file: UploadFile = File(...)):
+    dataset = await ingest_upload(file)
+    return {
+        "dataset_id": dataset.dataset_id,
+        "rows": len(dataset.df),
+        "columns": dataset.columns,
+        "encoding": dataset.encoding
+    }
+
+
+@app.get("/datasets/{dataset_id}")
+def dataset_status(dataset_id: str):
+    """Lets clients skip re-uploading content the server already holds."""
+    dataset = get_dataset(dataset_id)
+    return {
+        "dataset_id": dataset.dataset_id,
+        "rows": len(dataset.df),
+        "columns": dataset.columns
+    }
+
+
+@app.get("/datasets/{dataset_id}/results/{result_id}")
+async def get_result(dataset_id: str, result_id: str):
+    cached = get_dataset(dataset_id).results.get_by_key(result_id)
+    if cached is None:
+        raise HTTPException(
+            status_code=404, detail=f"Result {result_id} is no longer cached"
+        )
+
+    plan, aggregated = cached
+    result_df, _, _ = await run_in_pool(finalize_result, aggregated, plan.as_dict())
+    return {
+        "plan": plan.as_dict(),
+        "results": result_df.to_dict(orient="records"),
+        "statistics": result_df.attrs.get("statistics")
+    }
+
+
+@app.post("/datasets/{dataset_id}/append")
+async def append_dataset(dataset_id: str, file: UploadFile = File(...)):
+    """
+    Appends to a fork with its own dataset_id (returned); dataset_id
+    itself keeps the rows that were uploaded under it.
+    """
+    dataset = get_dataset(dataset_id)
+    data = await file.read()
+    appended_id = appended_dataset_id(dataset_id, await run_in_threadpool(content_hash, data))
+
+    appended = datasets.get(appended_id)
+    if appended is not None:
+        return {
+            "dataset_id": appended_id,
+            "parent_id": dataset_id,
+            "rows": len(appended.df),
+            "appended": len(appended.df) - len(dataset.df),
+            "updated": 0,
+            "invalidated": 0
+        }
+
+    async with admission.reserve(estimate_parse_memory(data)):
+        new_rows = await read_upload(data)
+        try:
+            return await run_in_threadpool(datasets.append, dataset, appended_id, new_rows)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+async def resolve_dataset(file: Optional[UploadFile], dataset_id: Optional[str]) -> Dataset:
+    if file is not None:
+        return await ingest_upload(file)
+    if dataset_id:
+        return get_dataset(dataset_id)
+    raise HTTPException(
+        status_code=400, detail="Provide either a file or a dataset_id"
+    )
+
+
+def get_session(session_id: str) -> Session:
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown or expired session_id: {session_id}"
+        )
+    return session
+
+
+@app.post("/sessions")
+async def create_session(
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None)
 ):
-    df = pd.read_csv(file.file)
+    dataset = await resolve_dataset(file, dataset_id)
+    session = sessions.create(dataset.dataset_id)
+    return {"session_id": session.session_id, "dataset_id": dataset.dataset_id}
+
+
+@app.get("/sessions/{session_id}")
+def session_status(session_id: str):
+    session = get_session(session_id)
+    return {
+        "session_id": session.session_id,
+        "dataset_id": session.dataset_id,
+        "turns": session.turns,
+        "last_question": session.question,
+        "last_plan": session.plan
+    }
+
+
+@app.delete("/sessions/{session_id}")
+def delete_session(session_id: str):
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown session_id: {session_id}")
+    return {"deleted": session_id}
+
+
+def current_physical(dataset: Dataset, physical: dict, version: int):
+    # Statistics from before an append could prove rows "empty" that now exist
+    if physical is not None and physical["version"] != version:
+        return None
+    return physical
+
+
+async def execute_cached(dataset: Dataset, plan: Plan, physical: dict = None,
+                         time_limit: float = None):
+    # Aggregates are cached per dataset and kept fresh on append
+    aggregated = dataset.results.get(plan)
+    if aggregated is None:
+        version = dataset.version
+        aggregated, partials = await run_in_pool(
+            compute_aggregate, dataset.df, plan.as_dict(), cancellable=True,
+            time_limit=time_limit, cube=dataset.cube,
+            physical=current_physical(dataset, physical, version)
+        )
+        dataset.cache_result(plan, version, aggregated, partials)
+
+    result_df, _, _ = await run_in_pool(
+        finalize_result, aggregated, plan.as_dict(), time_limit=time_limit
+    )
+    return result_df
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split()).rstrip("?.! ")
+
+
+async def run_analysis(dataset: Dataset, question: str, session: Session = None,
+                       approximate: bool = False, replan: bool = False,
+                       time_limit: float = None) -> dict:
+    """
+    Identical concurrent questions on the same dataset content share one
+    pipeline run. Session turns depend on their history, so they never do.
+    time_limit overrides the executor's per-call limit (background jobs).
+    """
+    if session is not None:
+        return await execute_analysis(
+            dataset, question, session, approximate, time_limit=time_limit
+        )
+
+    key = (dataset.dataset_id, dataset.version, approximate, replan, time_limit,
+           normalize_question(question))
+    return await coalescer.do(
+        key,
+        lambda: execute_analysis(
+            dataset, question, None, approximate, replan=replan, time_limit=time_limit
+        )
+    )
+
+
+async def execute_analysis(dataset: Dataset, question: str, session: Session = None,
+                           approximate: bool = False, plan: dict = None,
+                           timer: StageTimer = None, replan: bool = False,
+                           time_limit: float = None) -> dict:
+    """
+    Planner → validator → executor → explainer for one question.
+    A plan made ahead (e.g. from the upload's header) skips the planner,
+    and so does a question this dataset has already compiled a plan for,
+    unless replan asks for a fresh one.
+    """
+    df = dataset.df
 
     # Dataset info
     if is_dataset_info_query(question):
-        info_df = analyze_dataset(df)
-        insight = explainer.explain_dataset(df)
+        info_df = profile_to_frame(dataset.profile)
+        insight = await run_in_threadpool(explainer.explain_dataset, df)
         return {
             "type": "dataset_info",
+            "dataset_id": dataset.dataset_id,
             "table": info_df.to_dict(orient="records"),
             "insight": insight
         }
 
-    # Planner
-    plan = planner.generate_plan(list(df.columns), question)
+    timer = timer or StageTimer()
+    question_key = normalize_question(question)
+
+    # Session turns are planned against their history, never from the cache
+    compiled = None
+    if plan is None and session is None and not replan:
+        compiled = dataset.cached_plan(question_key)
+
+    # Planner (sees the session's previous turn for follow-ups)
+    if compiled is None and plan is None:
+        with timer.stage("plan"):
+            context = session.context(dataset.version) if session else None
+            plan = await run_in_threadpool(
+                planner.generate_plan, dataset.columns, question, context
+            )
+
+    base_df, refined = df, None
+    if compiled is None:
+        # Follow-ups run against the previous result / filtered rows
+        if session is not None and not approximate:
+            base_df, refined = session.base_for(plan, dataset)
+
+        # Validator
+        with timer.stage("validate"):
+            columns = frozenset(base_df.columns) if refined else dataset.column_set
+            try:
+                compiled = compile_plan(plan, columns)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        if session is None:
+            dataset.remember_plan(question_key, compiled)
+
+    if session is not None:
+        return await run_plan(dataset, question, compiled, session, base_df, refined,
+                              approximate, timer, time_limit)
+
+    # Differently worded questions that compile to the same plan run once
+    key = (dataset.dataset_id, dataset.version, approximate, time_limit, compiled.key)
+    return await plan_coalescer.do(
+        key,
+        lambda: run_plan(dataset, question, compiled, None, df, None, approximate, timer,
+                         time_limit)
+    )
+
 
-    # Validator
-    validate_plan(plan, list(df.columns))
+async def run_plan(dataset: Dataset, question: str, plan: Plan, session: Session,
+                   base_df: pd.DataFrame, refined, approximate: bool,
+                   timer: StageTimer, time_limit: float = None) -> dict:
+    """Optimizer → executor → explainer for a compiled plan."""
+    plan_dict = plan.as_dict()
+
+    # Session turns with filters keep their filtered rows for follow-ups
+    keeps_rows = session is not None and bool(refined or plan.filters)
+
+    # Optimizer (statistics describe the full dataset, not refined frames)
+    physical = None
+    if not approximate and not refined:
+        with timer.stage("optimize"):
+            physical = dataset.optimize(plan, use_cache=not keeps_rows)
+        metrics.increment(f"optimizer.strategy.{physical['strategy']}")
 
     # Executor
-    result_df, _, _ = execute_plan(df, plan)
+    filtered_df, cached = None, False
+    with timer.stage("execute"):
+        if approximate:
+            result_df, _, _ = await run_in_pool(
+                execute_plan_approximate, dataset.df, plan_dict, cancellable=True,
+                time_limit=time_limit, sample_fraction=APPROX_SAMPLE_FRACTION
+            )
+        elif keeps_rows:
+            result_df, _, filtered_df = await run_in_pool(
+                execute_plan, base_df, plan_dict, cancellable=True,
+                time_limit=time_limit, cube=None if refined else dataset.cube,
+                physical=current_physical(dataset, physical, dataset.version)
+            )
+        else:
+            result_df = await execute_cached(dataset, plan, physical, time_limit)
+            cached = True
+
+    if session is not None:
+        session.record(question, plan_dict, result_df, filtered_df, refined, dataset.version)
+
+    approximation = result_df.attrs.get("approximate")
 
-    # Explainer
-    insight = explainer.explain(question, result_df, plan)
+    # Explainer (cached results keep their explanation next to them)
+    insight = dataset.results.get_insight(plan) if cached else None
+    if insight is None:
+        with timer.stage("explain"):
+            insight = await run_in_threadpool(
+                explainer.explain, question, result_df, plan_dict, approximation
+            )
+        if cached:
+            dataset.results.put_insight(plan, insight)
 
     return {
         "type": "analysis",
-        "plan": plan,
+        "dataset_id": dataset.dataset_id,
+        "session_id": session.session_id if session else None,
+        "refined": refined,
+        "strategy": physical["strategy"] if physical else None,
+        "plan_key": plan.key,
+        "result_id": plan.key if cached else None,
+        "plan": plan_dict,
         "results": result_df.to_dict(orient="records"),
-        "insight": insight
+        "approximate": approximation,
+        "statistics": result_df.attrs.get("statistics"),
+        "insight": insight,
+        "timings": timer.timings
+    }
+
+
+async def resolve_target(file: Optional[UploadFile], dataset_id: Optional[str],
+                         session_id: Optional[str]):
+    """(dataset, session) for a question; a session implies its dataset."""
+    if session_id:
+        session = get_session(session_id)
+        return get_dataset(session.dataset_id), session
+    return await resolve_dataset(file, dataset_id), None
+
+
+def parse_columns(columns: Optional[str]):
+    """Client-supplied header: a JSON list of column names."""
+    if not columns:
+        return None
+    try:
+        names = json.loads(columns)
+    except json.JSONDecodeError:
+        names = None
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        raise HTTPException(status_code=400, detail="columns must be a JSON list of strings")
+    return names
+
+
+async def analyze_while_ingesting(data: bytes, dataset_id: str, question: str,
+                                  approximate: bool, columns: list = None) -> dict:
+    """
+    Plan from the header while the upload is parsed and encoded; the
+    planner only needs column names. Validation and execution start once
+    both are done. A header that does not match the parsed columns is
+    re-planned.
+    """
+    if columns is None:
+        try:
+            columns = await run_in_threadpool(read_header, data)
+        except Exception:
+            columns = None
+
+    if not columns:
+        dataset = await ingest_bytes(data, dataset_id)
+        return await run_analysis(dataset, question, None, approximate)
+
+    timer = StageTimer()
+
+    async def plan_from_header():
+        with timer.stage("plan"):
+            return await run_in_threadpool(planner.generate_plan, columns, question)
+
+    planning = asyncio.create_task(plan_from_header())
+    try:
+        with timer.stage("ingest"):
+            dataset = await ingest_bytes(data, dataset_id)
+    except BaseException:
+        planning.cancel()
+        raise
+
+    plan = await planning
+    if dataset.columns != columns:
+        metrics.increment("analyze.header_replanned")
+        plan = None
+
+    return await execute_analysis(
+        dataset, question, None, approximate, plan=plan, timer=timer
+    )
+
+
+@app.post("/analyze")
+async def analyze(
+    question: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None),
+    approximate: bool = Form(False),
+    columns: Optional[str] = Form(None),
+    replan: bool = Form(False)
+):
+    """replan=true skips the per-dataset plan cache and calls the planner."""
+    if file is not None and not session_id:
+        data = await file.read()
+        upload_id = await run_in_threadpool(content_hash, data)
+        dataset = datasets.get(upload_id)
+
+        # New upload: overlap planning with parsing instead of waiting for it
+        if dataset is None and not is_dataset_info_query(question):
+            header = parse_columns(columns)
+            key = (upload_id, None, approximate, normalize_question(question))
+            return await coalescer.do(
+                key,
+                lambda: analyze_while_ingesting(data, upload_id, question, approximate, header)
+            )
+
+        if dataset is None:
+            dataset = await ingest_bytes(data, upload_id)
+        return await run_analysis(dataset, question, None, approximate, replan)
+
+    dataset, session = await resolve_target(file, dataset_id, session_id)
+    return await run_analysis(dataset, question, session, approximate, replan)
+
+
+# -----------------------------------------------------
+# 🧭 EXPLAIN (physical plan, optionally run)
+# -----------------------------------------------------
+@app.post("/explain")
+async def explain_query(
+    dataset_id: str = Form(...),
+    question: Optional[str] = Form(None),
+    plan: Optional[str] = Form(None),
+    analyze: bool = Form(True)
+):
+    """
+    The optimizer's physical plan for a question (or a plan given as
+    JSON) with estimated row counts; analyze=true also runs it and
+    reports the actual row counts. Like /analyze, the "cached" strategy
+    reads the stored aggregate; explain never stores results itself.
+    """
+    dataset = get_dataset(dataset_id)
+    timer = StageTimer()
+
+    if plan:
+        try:
+            plan = json.loads(plan)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="plan must be valid JSON")
+    elif question:
+        with timer.stage("plan"):
+            plan = await run_in_threadpool(planner.generate_plan, dataset.columns, question)
+    else:
+        raise HTTPException(status_code=400, detail="Provide either a question or a plan")
+
+    with timer.stage("validate"):
+        try:
+            compiled = compile_plan(plan, dataset.column_set)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    with timer.stage("optimize"):
+        physical = dataset.optimize(compiled)
+
+    actual_rows = None
+    if analyze:
+        cached = dataset.results.get(compiled) if physical["strategy"] == "cached" else None
+        with timer.stage("execute"):
+            actual_rows = await run_in_pool(
+                explain_aggregate, dataset.df, compiled.as_dict(),
+                current_physical(dataset, physical, dataset.version),
+                cancellable=True, cube=dataset.cube, aggregated=cached
+            )
+
+    return {
+        "dataset_id": dataset.dataset_id,
+        "plan": compiled.as_dict(),
+        "plan_key": compiled.key,
+        "physical": physical,
+        "actual_rows": actual_rows,
+        "timings": timer.timings
     }
+
+
+# -----------------------------------------------------
+# 📬 BACKGROUND JOBS (submit → poll)
+# -----------------------------------------------------
+@app.post("/jobs")
+async def submit_job(
+    question: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None),
+    approximate: bool = Form(False),
+    priority: str = Form("interactive")
+):
+    dataset, session = await resolve_target(file, dataset_id, session_id)
+
+    try:
+        job_id = job_queue.submit(
+            # Jobs exist for long analyses: they get their own time limit
+            lambda: run_analysis(
+                dataset, question, session, approximate, time_limit=JOB_TIME_LIMIT_SECONDS
+            ),
+            question,
+            dataset.dataset_id,
+            priority,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"job_id": job_id, "status": "queued", "priority": priority}
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job_id: {job_id}")
+    return job
+
+
+@app.post("/analyze/progressive")
+async def analyze_progressive(
+    question: str = Form(...),
+    file: Optional[UploadFile] = File(None),
+    dataset_id: Optional[str] = Form(None)
+):
+    """
+    Streams newline-delimited JSON: one approximate result per sample
+    size, then the final result with its explanation.
+    """
+    dataset = await resolve_dataset(file, dataset_id)
+    df = dataset.df
+
+    raw_plan = await run_in_threadpool(planner.generate_plan, dataset.columns, question)
+    try:
+        plan = compile_plan(raw_plan, dataset.column_set).as_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def refinements():
+        result_df = None
+
+        for fraction in APPROX_PROGRESSIVE_FRACTIONS:
+            result_df, _, _ = await run_in_pool(
+                execute_plan_approximate, df, plan, cancellable=True,
+                sample_fraction=fraction
+            )
+            approximation = result_df.attrs.get("approximate")
+
+            yield json.dumps({
+                "type": "estimate",
+                "results": result_df.to_dict(orient="records"),
+                "approximate": approximation
+            }, default=str) + "\n"
+
+            if approximation is None or max_relative_error(result_df) <= APPROX_TARGET_RELATIVE_ERROR:
+                break
+
+        insight = await run_in_threadpool(
+            explainer.explain, question, result_df, plan, result_df.attrs.get("approximate")
+        )
+        yield json.dumps({
+            "type": "analysis",
+            "dataset_id": dataset.dataset_id,
+            "plan": plan,
+            "approximate": result_df.attrs.get("approximate"),
+            "insight": insight
+        }, default=str) + "\n"
+
+    return StreamingResponse(refinements(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
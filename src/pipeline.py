@@ -0,0 +1,40 @@
+from executor.executor import execute_plan
+from schemas.plan_validator import compile_plan
+from utils.timing import StageTimer
+
+
+# -----------------------------------------------------
+# 🔁 IN-PROCESS PLANNER → VALIDATOR → EXECUTOR → EXPLAINER
+# -----------------------------------------------------
+def run_pipeline(df, question, planner, explainer=None, cube=None, timer=None):
+    """
+    Synchronous equivalent of /analyze for a loaded DataFrame.
+    Skips the explainer when none is given.
+    """
+    timer = timer or StageTimer()
+    columns = list(df.columns)
+
+    with timer.stage("plan"):
+        plan = planner.generate_plan(columns, question)
+
+    with timer.stage("validate"):
+        compiled = compile_plan(plan, columns)
+        plan = compiled.as_dict()
+
+    with timer.stage("execute"):
+        result_df, _, _ = execute_plan(df, plan, cube=cube)
+
+    insight = None
+    if explainer is not None:
+        with timer.stage("explain"):
+            insight = explainer.explain(question, result_df, plan)
+
+    return {
+        "type": "analysis",
+        "plan": plan,
+        "plan_key": compiled.key,
+        "results": result_df.to_dict(orient="records"),
+        "statistics": result_df.attrs.get("statistics"),
+        "insight": insight,
+        "timings": timer.timings
+    }
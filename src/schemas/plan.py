@@ -0,0 +1,136 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+
+# -----------------------------------------------------
+# 🧱 CANONICAL PLAN PARTS
+# -----------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class Filter:
+    column: str
+    operator: str
+    value: object  # lists are stored as tuples
+
+    def as_dict(self) -> dict:
+        value = list(self.value) if isinstance(self.value, tuple) else self.value
+        return {"column": self.column, "operator": self.operator, "value": value}
+
+
+@dataclass(frozen=True, slots=True)
+class Metric:
+    column: str
+    operation: str
+
+    def as_dict(self) -> dict:
+        return {"column": self.column, "operation": self.operation}
+
+
+@dataclass(frozen=True, slots=True)
+class Sort:
+    by: str = None
+    order: str = None
+
+    def as_dict(self) -> dict:
+        return {"by": self.by, "order": self.order}
+
+
+@dataclass(frozen=True, slots=True)
+class Visualization:
+    type: str
+    x: str = None
+    y: str = None
+    color: str = None
+    top_n: int = None
+    bins: int = None
+
+    def as_dict(self) -> dict:
+        return {
+            "type": self.type,
+            "x": self.x,
+            "y": self.y,
+            "color": self.color,
+            "top_n": self.top_n,
+            "bins": self.bins
+        }
+
+
+# -----------------------------------------------------
+# 🔒 READ-ONLY VIEWS (copies and pickles are plain dicts / lists)
+# -----------------------------------------------------
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Plan dicts are shared and read-only; copy before changing them")
+
+
+class _ReadOnlyDict(dict):
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _ReadOnlyList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return _ReadOnlyDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return _ReadOnlyList(_freeze(v) for v in value)
+    return value
+
+
+# -----------------------------------------------------
+# 📜 IMMUTABLE PLAN (hashed once, shared as the cache key)
+# -----------------------------------------------------
+@dataclass(frozen=True, slots=True, eq=False)
+class Plan:
+    """
+    Validated, canonical analysis plan. Built by compile_plan; key is the
+    sha256 of its canonical JSON and identifies the plan in every cache.
+    as_dict() is the read-only dict view the executor works on.
+    """
+
+    analysis_type: str
+    filters: tuple = ()
+    group_by: tuple = ()
+    metrics: tuple = ()
+    sort: Sort = None
+    visualization: Visualization = None
+    time_grain: str = None
+    refine: str = None
+    user_intent: tuple = ()  # sorted (name, value) pairs
+    key: str = field(init=False, compare=False, repr=False)
+    _dict: dict = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        data = {
+            "analysis_type": self.analysis_type,
+            "filters": [f.as_dict() for f in self.filters],
+            "group_by": list(self.group_by),
+            "metrics": [m.as_dict() for m in self.metrics],
+            "sort": self.sort.as_dict() if self.sort else {},
+            "visualization": self.visualization.as_dict() if self.visualization else {},
+            "time_grain": self.time_grain,
+            "refine": self.refine,
+            "user_intent": dict(self.user_intent)
+        }
+        payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+        object.__setattr__(self, "_dict", _freeze(data))
+        object.__setattr__(self, "key", hashlib.sha256(payload.encode("utf-8")).hexdigest())
+
+    def __eq__(self, other):
+        return isinstance(other, Plan) and other.key == self.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def as_dict(self) -> dict:
+        return self._dict
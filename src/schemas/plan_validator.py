@@ -1,4 +1,5 @@
 # schemas/plan_validator.py
+from schemas.plan import Filter, Metric, Plan, Sort, Visualization
 
 ALLOWED_ANALYSIS_TYPES = {
     "comparison",
@@ -11,28 +12,48 @@ ALLOWED_ANALYSIS_TYPES = {
 ALLOWED_OPERATORS = {"==", "!=", ">", "<", ">=", "<=", "in"}
 ALLOWED_METRICS = {"sum", "mean", "count", "min", "max", "median", "std"}
 ALLOWED_VIZ_TYPES = {"bar", "line", "scatter", "histogram"}
+ALLOWED_TIME_GRAINS = {"day", "week", "month", "quarter", "year"}
+ALLOWED_REFINE_LEVELS = {"filtered", "result"}
 
 # ⛔ Visualization keywords that MUST NOT appear in metrics
 INVALID_METRIC_OPERATIONS = {"bar", "line", "scatter", "histogram"}
 
+REQUIRED_KEYS = (
+    "analysis_type",
+    "filters",
+    "group_by",
+    "metrics",
+    "sort",
+    "visualization"
+)
 
-def validate_plan(plan: dict, df_columns: list):
+VIZ_NULLABLE_KEYS = ("x", "y", "color", "top_n", "bins")
+
+
+def _null(value):
+    # 🔥 FIX: Convert string "null"/"NULL" to actual None
+    return None if value in ("null", "NULL") else value
+
+
+def compile_plan(plan: dict, columns) -> Plan:
+    """
+    Validate a planner dict and build its canonical, immutable Plan.
+
+    columns is checked by set lookup (pass a frozenset to reuse it across
+    plans). The input dict is never modified. Filters are ordered by
+    column (stable, so filters on one column keep their order) because
+    the order of filters on different columns does not change the result.
+    """
     if not isinstance(plan, dict):
         raise ValueError("Plan must be a dictionary")
 
+    if not isinstance(columns, (set, frozenset)):
+        columns = frozenset(columns)
+
     # --------------------------------------------------
     # REQUIRED KEYS
     # --------------------------------------------------
-    required_keys = [
-        "analysis_type",
-        "filters",
-        "group_by",
-        "metrics",
-        "sort",
-        "visualization"
-    ]
-
-    for key in required_keys:
+    for key in REQUIRED_KEYS:
         if key not in plan:
             raise ValueError(f"Missing key: {key}")
 
@@ -44,27 +65,48 @@ def validate_plan(plan: dict, df_columns: list):
     # --------------------------------------------------
     # FILTERS
     # --------------------------------------------------
-    for f in plan["filters"]:
-        if f["column"] not in df_columns:
+    filters = []
+    for f in plan["filters"] or []:
+        if f["column"] not in columns:
             raise ValueError(f"Invalid filter column: {f['column']}")
         if f["operator"] not in ALLOWED_OPERATORS:
             raise ValueError(f"Invalid operator: {f['operator']}")
         if f["operator"] == "in" and not isinstance(f["value"], list):
             raise ValueError("Operator 'in' requires a list value")
 
+        value = f.get("value")
+        filters.append(Filter(
+            f["column"], f["operator"], tuple(value) if isinstance(value, list) else value
+        ))
+
+    filters.sort(key=lambda f: f.column)
+
     # --------------------------------------------------
     # GROUP BY
     # --------------------------------------------------
-    for col in plan["group_by"]:
-        if col not in df_columns:
+    group_by = tuple(plan["group_by"] or ())
+    for col in group_by:
+        if col not in columns:
             raise ValueError(f"Invalid group_by column: {col}")
 
+    # --------------------------------------------------
+    # TIME GRAIN (optional, buckets datetime group_by columns)
+    # --------------------------------------------------
+    time_grain = plan.get("time_grain")
+    if time_grain is not None and time_grain not in ALLOWED_TIME_GRAINS:
+        raise ValueError(f"Invalid time_grain: {time_grain}")
+
+    # Follow-up refinement of a session's previous turn (optional)
+    refine = plan.get("refine")
+    if refine is not None and refine not in ALLOWED_REFINE_LEVELS:
+        raise ValueError(f"Invalid refine level: {refine}")
+
     # --------------------------------------------------
     # 🔥 METRICS (DEFENSIVE + INTENT AWARE)
     # --------------------------------------------------
-    cleaned_metrics = []
+    metrics = []
 
-    for m in plan["metrics"]:
+    for m in plan["metrics"] or []:
         op = m.get("operation")
 
         # 🚫 Drop visualization operations silently
@@ -77,32 +119,44 @@ def validate_plan(plan: dict, df_columns: list):
                 "Only statistical operations are allowed."
             )
 
-        if m["column"] not in df_columns:
+        if m["column"] not in columns:
             raise ValueError(f"Invalid metric column: {m['column']}")
 
-        cleaned_metrics.append(m)
-
-    # Replace metrics with cleaned version
-    plan["metrics"] = cleaned_metrics
+        metrics.append(Metric(m["column"], op))
 
     # Distribution & correlation MUST NOT have metrics
-    if analysis_type in {"distribution", "correlation"} and plan["metrics"]:
+    if analysis_type in {"distribution", "correlation"} and metrics:
         raise ValueError(
             f"{analysis_type} analysis must not contain metrics"
         )
 
+    sort_cfg = plan["sort"] or {}
+    sort = None
+    if sort_cfg.get("by"):
+        sort = Sort(sort_cfg["by"], sort_cfg.get("order") or "asc")
+
+    intent = plan.get("user_intent")
+    user_intent = tuple(sorted(intent.items())) if isinstance(intent, dict) else ()
+
+    compiled = dict(
+        analysis_type=analysis_type,
+        filters=tuple(filters),
+        group_by=group_by,
+        metrics=tuple(metrics),
+        sort=sort,
+        time_grain=time_grain,
+        refine=refine,
+        user_intent=user_intent
+    )
+
     # --------------------------------------------------
     # VISUALIZATION - PROPERLY HANDLE NULL VALUES
     # --------------------------------------------------
     viz = plan["visualization"]
     if not viz:
-        return True
+        return Plan(**compiled)
 
-    # 🔥 FIX: Convert string "null"/"NULL" to actual None
-    for key in ["x", "y", "color", "top_n"]:
-        if key in viz:
-            if viz[key] in ("null", "NULL"):
-                viz[key] = None
+    viz = {key: _null(viz.get(key)) for key in VIZ_NULLABLE_KEYS} | {"type": viz.get("type")}
 
     if viz["type"] not in ALLOWED_VIZ_TYPES:
         raise ValueError(f"Invalid visualization type: {viz['type']}")
@@ -110,39 +164,40 @@ def validate_plan(plan: dict, df_columns: list):
     # --------------------------------------------------
     # TYPE-SPECIFIC VALIDATION
     # --------------------------------------------------
-    
+
     # Histogram rules
     if viz["type"] == "histogram":
-        if viz.get("y") is not None:
+        if viz["y"] is not None:
             raise ValueError("Histogram must not have y-axis")
-        if viz.get("x") is None:
+        if viz["x"] is None:
             raise ValueError("Histogram must have x-axis specified")
 
     # Correlation rules
     if analysis_type == "correlation":
         if viz["type"] != "scatter":
             raise ValueError("Correlation requires scatter plot")
-        if viz.get("x") is None or viz.get("y") is None:
+        if viz["x"] is None or viz["y"] is None:
             raise ValueError("Correlation scatter plot must have both x and y axes")
 
     # --------------------------------------------------
     # VALIDATE X/Y AXES (ONLY IF NOT NULL)
     # --------------------------------------------------
-    
-    # Only validate x if it's not None
-    if viz.get("x") is not None and viz["x"] not in df_columns:
+    if viz["x"] is not None and viz["x"] not in columns:
         raise ValueError(f"Invalid x-axis: {viz['x']}")
 
-    # Only validate y if it's not None AND not a valid case for null
-    if viz.get("y") is not None:
-        if viz["y"] not in df_columns:
-            raise ValueError(f"Invalid y-axis: {viz['y']}")
+    if viz["y"] is not None and viz["y"] not in columns:
+        raise ValueError(f"Invalid y-axis: {viz['y']}")
 
     # --------------------------------------------------
     # TOP N VALIDATION
     # --------------------------------------------------
-    if viz.get("top_n") is not None:
+    if viz["top_n"] is not None:
         if not isinstance(viz["top_n"], int) or viz["top_n"] <= 0:
             raise ValueError("top_n must be a positive integer")
 
-    return True
\ No newline at end of file
+    # Histogram bin count (null → automatic)
+    if viz["bins"] is not None:
+        if not isinstance(viz["bins"], int) or viz["bins"] <= 0:
+            raise ValueError("bins must be a positive integer")
+
+    return Plan(**compiled, visualization=Visualization(**viz))
@@ -0,0 +1,185 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from agents.dataset_analyzer import build_profile, update_profile
+from executor.cube import AggregateCube
+from executor.optimizer import optimize_plan
+from executor.result_cache import ResultCache
+from ingest.datetimes import parse_datetimes, to_datetime_column
+from ingest.encoding import encode_categoricals, concat_encoded
+from schemas.plan import Plan
+
+# Compiled plans remembered per dataset, by normalized question
+MAX_CACHED_PLANS = 128
+
+
+def appended_dataset_id(dataset_id: str, rows_hash: str) -> str:
+    """
+    Id of dataset_id with an upload appended (rows_hash is the upload's
+    content hash). Content ids always name unchanged uploads, so the
+    appended version gets an id of its own, the same for the same rows.
+    """
+    return hashlib.sha256(f"{dataset_id}+{rows_hash}".encode("utf-8")).hexdigest()
+
+
+# -----------------------------------------------------
+# 📦 LOADED DATASET
+# -----------------------------------------------------
+class Dataset:
+    def __init__(self, dataset_id: str, df: pd.DataFrame, cube_max_cardinality=None,
+                 categorical_max_cardinality=None):
+        df, datetimes = parse_datetimes(df)
+        df, self.encoding = encode_categoricals(df, categorical_max_cardinality)
+        self.encoding.update(datetimes)
+
+        self.dataset_id = dataset_id
+        self.parent_id = None
+        self.df = df
+        self.column_set = frozenset(df.columns)
+        self.plans = OrderedDict()
+        self.profile = build_profile(df)
+        self.cube = None
+        if cube_max_cardinality:
+            self.cube = AggregateCube.build(df, max_cardinality=cube_max_cardinality)
+        self.results = ResultCache()
+        self.version = 0
+        self.lock = threading.Lock()
+
+    @property
+    def columns(self) -> list:
+        return list(self.df.columns)
+
+    def cache_result(self, plan: Plan, version: int, aggregated, partials=None):
+        # Drop results computed against rows that have since been appended to
+        with self.lock:
+            if version == self.version:
+                self.results.put(plan, aggregated, partials)
+
+    def cached_plan(self, question_key: str):
+        with self.lock:
+            plan = self.plans.get(question_key)
+            if plan is not None:
+                self.plans.move_to_end(question_key)
+            return plan
+
+    def remember_plan(self, question_key: str, plan: Plan):
+        # Appends keep the columns, so plans stay valid across versions
+        with self.lock:
+            self.plans[question_key] = plan
+            self.plans.move_to_end(question_key)
+            while len(self.plans) > MAX_CACHED_PLANS:
+                self.plans.popitem(last=False)
+
+    def optimize(self, plan: Plan, use_cache: bool = True) -> dict:
+        """Physical plan from the current statistics, tagged with their version."""
+        with self.lock:
+            physical = optimize_plan(
+                plan.as_dict(),
+                self.profile,
+                len(self.df),
+                cube=self.cube,
+                cached=use_cache and plan in self.results
+            )
+            physical["version"] = self.version
+        return physical
+
+    def fork(self, dataset_id: str) -> "Dataset":
+        """
+        Copy under a new id. Frames and cached aggregates are shared until
+        replaced; everything append changes in place is copied.
+        """
+        with self.lock:
+            child = copy.copy(self)
+            child.dataset_id = dataset_id
+            child.parent_id = self.dataset_id
+            child.encoding = copy.deepcopy(self.encoding)
+            child.profile = copy.deepcopy(self.profile)
+            child.plans = OrderedDict(self.plans)
+            child.results = self.results.copy()
+            child.cube = self.cube.copy() if self.cube is not None else None
+            child.lock = threading.Lock()
+        return child
+
+    def append(self, new_rows: pd.DataFrame) -> dict:
+        """Append rows in place; DatasetStore.append forks first."""
+        if list(new_rows.columns) != self.columns:
+            raise ValueError(
+                "Appended rows must have the same columns as the dataset. "
+                f"Expected {self.columns}, got {list(new_rows.columns)}"
+            )
+
+        new_rows = new_rows.assign(**{
+            col: to_datetime_column(new_rows[col])
+            for col in self.encoding["datetime_columns"]
+        })
+
+        with self.lock:
+            combined, new_rows = concat_encoded(self.df, new_rows)
+            update_profile(self.profile, new_rows, combined.dtypes)
+            cache_stats = self.results.apply_append(new_rows)
+            if self.cube is not None:
+                self.cube.append(new_rows)
+            self.df = combined
+            self.version += 1
+
+        return {
+            "dataset_id": self.dataset_id,
+            "parent_id": self.parent_id,
+            "rows": len(self.df),
+            "appended": len(new_rows),
+            **cache_stats
+        }
+
+
+# -----------------------------------------------------
+# 🗂 IN-MEMORY DATASET REGISTRY (LRU)
+# -----------------------------------------------------
+class DatasetStore:
+    def __init__(self, max_datasets: int = 8, cube_max_cardinality=None,
+                 categorical_max_cardinality=None):
+        self.max_datasets = max_datasets
+        self.cube_max_cardinality = cube_max_cardinality
+        self.categorical_max_cardinality = categorical_max_cardinality
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return dataset_id in self._datasets
+
+    def get(self, dataset_id: str) -> Dataset:
+        with self._lock:
+            dataset = self._datasets.get(dataset_id)
+            if dataset is not None:
+                self._datasets.move_to_end(dataset_id)
+            return dataset
+
+    def put(self, dataset_id: str, df: pd.DataFrame) -> Dataset:
+        dataset = Dataset(
+            dataset_id,
+            df,
+            cube_max_cardinality=self.cube_max_cardinality,
+            categorical_max_cardinality=self.categorical_max_cardinality,
+        )
+        self._register(dataset)
+        return dataset
+
+    def append(self, dataset: Dataset, dataset_id: str, new_rows: pd.DataFrame) -> dict:
+        """
+        Register dataset plus new_rows as dataset_id. The original keeps
+        its rows, so its content id still names exactly what was uploaded.
+        """
+        child = dataset.fork(dataset_id)
+        summary = child.append(new_rows)
+        self._register(child)
+        return summary
+
+    def _register(self, dataset: Dataset):
+        with self._lock:
+            self._datasets[dataset.dataset_id] = dataset
+            self._datasets.move_to_end(dataset.dataset_id)
+            while len(self._datasets) > self.max_datasets:
+                self._datasets.popitem(last=False)
@@ -0,0 +1,110 @@
+import json
+import sqlite3
+import threading
+import time
+
+JOB_STATUSES = {"queued", "running", "done", "failed"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id       TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    priority     TEXT NOT NULL,
+    question     TEXT NOT NULL,
+    dataset_id   TEXT,
+    submitted_at REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    result       TEXT,
+    error        TEXT
+)
+"""
+
+_FINISHED_INDEX = "CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)"
+
+
+# -----------------------------------------------------
+# 🗃 SQLITE-BACKED JOB RESULTS
+# -----------------------------------------------------
+class JobStore:
+    """
+    Job status and results, persisted so finished results survive a
+    client timeout or a restart. Jobs left queued/running by a previous
+    process are marked failed: their datasets lived in memory. Jobs
+    finished more than retention_seconds ago are purged at startup and
+    whenever another job finishes.
+    """
+
+    def __init__(self, path: str = "jobs.sqlite3", retention_seconds: float = 86400):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(_FINISHED_INDEX)
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                "error = 'Server restarted before the job finished' "
+                "WHERE status IN ('queued', 'running')",
+                (time.time(),)
+            )
+        self.retention_seconds = retention_seconds
+        self.purge()
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params)
+
+    def purge(self):
+        """Drop jobs that finished more than retention_seconds ago."""
+        self._execute(
+            "DELETE FROM jobs WHERE finished_at < ?",
+            (time.time() - self.retention_seconds,)
+        )
+
+    def create(self, job_id: str, priority: str, question: str, dataset_id: str = None):
+        self._execute(
+            "INSERT INTO jobs (job_id, status, priority, question, dataset_id, submitted_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?)",
+            (job_id, priority, question, dataset_id, time.time())
+        )
+
+    def mark_running(self, job_id: str):
+        self._execute(
+            "UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?",
+            (time.time(), job_id)
+        )
+
+    def complete(self, job_id: str, result: dict):
+        self._execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, result = ? WHERE job_id = ?",
+            (time.time(), json.dumps(result, default=str), job_id)
+        )
+        # Each finished job sweeps expired ones, so long-running servers stay bounded
+        self.purge()
+
+    def fail(self, job_id: str, error: str):
+        self._execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE job_id = ?",
+            (time.time(), error, job_id)
+        )
+        self.purge()
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(row)
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
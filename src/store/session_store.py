@@ -0,0 +1,154 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+from agents.result_summarizer import compact_plan
+
+REFINE_LEVELS = {"filtered", "result"}
+
+# Re-aggregating a previous result reproduces these (and only these) when
+# the metric repeats the operation that produced its column
+REAGGREGATABLE_OPERATIONS = {"sum", "min", "max"}
+
+
+def _plan_columns(plan: dict) -> set:
+    viz = plan.get("visualization") or {}
+    columns = {f.get("column") for f in plan.get("filters", [])}
+    columns |= set(plan.get("group_by", []))
+    columns |= {m.get("column") for m in plan.get("metrics", [])}
+    columns |= {viz.get("x"), viz.get("y"), viz.get("color")}
+    columns.add((plan.get("sort") or {}).get("by"))
+    return columns - {None, ""}
+
+
+def _filter_key(f: dict) -> tuple:
+    value = f.get("value")
+    if isinstance(value, list):
+        value = tuple(value)
+    return f.get("column"), f.get("operator"), value
+
+
+# -----------------------------------------------------
+# 💬 CONVERSATIONAL SESSION
+# -----------------------------------------------------
+class Session:
+    """
+    Dataset plus the previous turn's plan, result and filtered rows, so
+    follow-up questions can refine them instead of rescanning.
+    """
+
+    def __init__(self, session_id: str, dataset_id: str):
+        self.session_id = session_id
+        self.dataset_id = dataset_id
+        self.turns = 0
+        self.question = None
+        self.plan = None
+        self.result_df = None
+        self.filtered_df = None
+        self.version = None
+        self.last_used = time.monotonic()
+
+    def context(self, version: int):
+        """Previous turn for the planner, or None when there is none usable."""
+        if self.plan is None or version != self.version:
+            return None
+        return {
+            "question": self.question,
+            "plan": compact_plan(self.plan),
+            "result_columns": list(self.result_df.columns)
+        }
+
+    def base_for(self, plan: dict, dataset):
+        """
+        Frame the plan runs against and the refine level actually used.
+
+        "result"   → the previous result table (see _result_answers)
+        "filtered" → the previous filtered rows (plan keeps every previous filter)
+        A "result" plan the table cannot answer falls back to "filtered";
+        anything else, or state from an older dataset version, is a full run.
+        """
+        refine = plan.get("refine")
+        if refine not in REFINE_LEVELS or self.plan is None or self.version != dataset.version:
+            return dataset.df, None
+
+        if refine == "result" and self._result_answers(plan):
+            return self.result_df, "result"
+
+        previous = {_filter_key(f) for f in self.plan.get("filters", [])}
+        current = {_filter_key(f) for f in plan.get("filters", [])}
+        if self.filtered_df is not None and previous <= current:
+            return self.filtered_df, "filtered"
+        return dataset.df, None
+
+    def _result_answers(self, plan: dict) -> bool:
+        """
+        Whether the previous result gives the same answer as the rows:
+        every column the plan reads, plots or sorts by is in the result,
+        and each metric re-applies sum/min/max to a column the previous
+        turn produced with that same operation (a mean or count of sums
+        would silently be wrong).
+        """
+        if not _plan_columns(plan) <= set(self.result_df.columns):
+            return False
+
+        produced = {m.get("column"): m.get("operation") for m in self.plan.get("metrics", [])}
+        return all(
+            m.get("operation") in REAGGREGATABLE_OPERATIONS
+            and produced.get(m.get("column")) == m.get("operation")
+            for m in plan.get("metrics", [])
+        )
+
+    def record(self, question: str, plan: dict, result_df: pd.DataFrame,
+               filtered_df, refined, version: int):
+        self.turns += 1
+        self.question = question
+        self.plan = plan
+        self.result_df = result_df
+        self.version = version
+
+        # A result-level refinement keeps the row set of the turn it refined;
+        # unfiltered runs reference the dataset itself instead of a copy
+        if refined != "result":
+            self.filtered_df = filtered_df if plan.get("filters") else None
+
+
+# -----------------------------------------------------
+# 🗂 SESSION REGISTRY (LRU + idle expiry)
+# -----------------------------------------------------
+class SessionStore:
+    def __init__(self, max_sessions: int = 64, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for session_id, session in list(self._sessions.items()):
+            if session.last_used < cutoff:
+                del self._sessions[session_id]
+
+    def create(self, dataset_id: str) -> Session:
+        session = Session(uuid.uuid4().hex, dataset_id)
+        with self._lock:
+            self._expire()
+            self._sessions[session.session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Session:
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
@@ -0,0 +1,114 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+from utils.metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within the memory budget."""
+
+    def __init__(self, message: str, retry_after: int = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# -----------------------------------------------------
+# 🚦 MEMORY ADMISSION CONTROL
+# -----------------------------------------------------
+class MemoryAdmission:
+    """
+    Tracks the estimated bytes of in-flight requests against a budget.
+
+    A request that does not fit waits in a bounded FIFO queue for up to
+    max_wait_seconds; past that (or with a full queue) it is rejected
+    with a retry hint based on how long admitted requests hold memory.
+    """
+
+    def __init__(self, budget_bytes: int, max_queue: int = 16,
+                 max_wait_seconds: float = 10):
+        self.budget_bytes = budget_bytes
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self._in_flight = 0
+        self._waiters = []
+        self._condition = None
+        self._mean_hold_seconds = 1.0
+
+        metrics.set_gauge("admission.budget_bytes", budget_bytes)
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("admission.in_flight_bytes", self._in_flight)
+        metrics.set_gauge("admission.queued", len(self._waiters))
+
+    def _fits(self, nbytes: int) -> bool:
+        return self._in_flight + nbytes <= self.budget_bytes
+
+    def _reject(self, reason: str):
+        metrics.increment("admission.rejected")
+        retry_after = max(1, math.ceil(self._mean_hold_seconds * (len(self._waiters) + 1)))
+        raise AdmissionRejected(reason, retry_after)
+
+    async def _acquire(self, nbytes: int):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        if nbytes > self.budget_bytes:
+            metrics.increment("admission.rejected")
+            raise AdmissionRejected(
+                f"Request needs ~{nbytes >> 20} MB, above the "
+                f"{self.budget_bytes >> 20} MB memory budget"
+            )
+
+        async with self._condition:
+            if not self._waiters and self._fits(nbytes):
+                self._in_flight += nbytes
+                self._publish()
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                self._reject("Too many requests waiting for memory")
+
+            ticket = object()
+            self._waiters.append(ticket)
+            self._publish()
+            try:
+                # FIFO: only the head of the queue may take memory
+                await asyncio.wait_for(
+                    self._condition.wait_for(
+                        lambda: self._waiters[0] is ticket and self._fits(nbytes)
+                    ),
+                    timeout=self.max_wait_seconds
+                )
+            except asyncio.TimeoutError:
+                self._reject("Timed out waiting for memory")
+            finally:
+                self._waiters.remove(ticket)
+                self._publish()
+                self._condition.notify_all()
+
+            self._in_flight += nbytes
+            self._publish()
+
+    async def _release(self, nbytes: int, held_seconds: float):
+        async with self._condition:
+            self._in_flight -= nbytes
+            self._mean_hold_seconds = 0.8 * self._mean_hold_seconds + 0.2 * held_seconds
+            self._publish()
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int):
+        """Hold nbytes of the budget for the duration of the block."""
+        started = time.perf_counter()
+        await self._acquire(nbytes)
+        admitted = time.perf_counter()
+        metrics.increment("admission.admitted")
+        metrics.observe("admission.wait_seconds", admitted - started)
+        try:
+            yield
+        finally:
+            await self._release(nbytes, time.perf_counter() - admitted)
@@ -0,0 +1,52 @@
+import threading
+
+
+# -----------------------------------------------------
+# 📏 IN-PROCESS METRICS REGISTRY
+# -----------------------------------------------------
+class MetricsRegistry:
+    """
+    Minimal thread-safe counters, gauges and timing observations.
+    Exposed as JSON through the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._observations = {}
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            obs = self._observations.setdefault(
+                name, {"count": 0, "sum": 0.0, "max": 0.0}
+            )
+            obs["count"] += 1
+            obs["sum"] += value
+            obs["max"] = max(obs["max"], value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            observations = {
+                name: {
+                    **obs,
+                    "mean": obs["sum"] / obs["count"] if obs["count"] else 0.0
+                }
+                for name, obs in self._observations.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": observations
+            }
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,48 @@
+import asyncio
+
+from utils.metrics import metrics
+
+
+# -----------------------------------------------------
+# 🛬 SINGLE-FLIGHT REQUEST COALESCING
+# -----------------------------------------------------
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution: the first
+    caller runs fn, later ones await its result (or its exception).
+    Nothing is cached once the call finishes.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._in_flight = {}
+
+    def __len__(self):
+        return len(self._in_flight)
+
+    async def do(self, key, fn):
+        future = self._in_flight.get(key)
+        if future is not None:
+            metrics.increment(f"{self.name}.coalesced")
+            # shield: a follower giving up must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" when nobody else waited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+        metrics.increment(f"{self.name}.executed")
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
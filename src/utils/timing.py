@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+
+from utils.metrics import metrics
+
+
+# -----------------------------------------------------
+# ⏱ PER-STAGE TIMINGS
+# -----------------------------------------------------
+class StageTimer:
+    """
+    Records wall-clock seconds per pipeline stage for one request and
+    mirrors them into the metrics registry.
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            metrics.observe(f"stage.{name}_seconds", elapsed)
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+# Modules import each other with src/ on the path (as in the Docker image)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def app_main(monkeypatch):
+    """
+    The API module with the LLM agents stubbed out. The app's shutdown hook
+    closes the pool and job store for good, so every test gets fresh ones.
+    """
+    os.environ.setdefault("GROQ_API_KEY", "test")
+    os.environ.setdefault("JOB_DB_PATH", ":memory:")
+    import main
+
+    job_store = main.JobStore(":memory:", retention_seconds=main.JOB_RETENTION_SECONDS)
+    monkeypatch.setattr(main, "execution_pool", main.ExecutionPool(
+        max_workers=main.EXECUTOR_MAX_WORKERS,
+        mode="thread",
+        time_limit_seconds=main.EXECUTOR_TIME_LIMIT_SECONDS,
+    ))
+    monkeypatch.setattr(main, "job_store", job_store)
+    monkeypatch.setattr(main, "job_queue", main.JobQueue(job_store, workers=main.JOB_WORKERS))
+    monkeypatch.setattr(main.explainer, "explain", lambda *args, **kwargs: "insight")
+    yield main
+    main.execution_pool.shutdown()
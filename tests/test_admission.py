@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ingest.readers import estimate_parse_memory
+from utils.admission import AdmissionRejected, MemoryAdmission
+
+CSV = b"COUNTRY,SALES\nUSA,10\nFrance,5\n"
+
+
+def _client(app_main, monkeypatch, budget_bytes, max_queue=16):
+    admission = MemoryAdmission(budget_bytes, max_queue=max_queue, max_wait_seconds=0.1)
+    monkeypatch.setattr(app_main, "admission", admission)
+    return TestClient(app_main.app), admission
+
+
+def test_upload_over_the_budget_is_413(app_main, monkeypatch):
+    client, _ = _client(app_main, monkeypatch, estimate_parse_memory(CSV) - 1)
+    with client:
+        response = client.post("/datasets", files={"file": ("a.csv", CSV)})
+
+    assert response.status_code == 413
+    assert "Retry-After" not in response.headers
+
+
+def test_upload_with_a_full_queue_is_429(app_main, monkeypatch):
+    client, admission = _client(app_main, monkeypatch, 1 << 30, max_queue=0)
+    with client, client.portal.wrap_async_context_manager(admission.reserve(1 << 30)):
+        response = client.post("/datasets", files={"file": ("b.csv", CSV)})
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_waiters_are_admitted_in_order_as_memory_frees():
+    admission = MemoryAdmission(100, max_queue=2, max_wait_seconds=1)
+    order = []
+
+    async def request(name, nbytes, hold):
+        async with admission.reserve(nbytes):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def main():
+        first = asyncio.create_task(request("first", 100, 0.05))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(request(n, 60, 0)) for n in ("second", "third")]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await request("fourth", 10, 0)
+        await asyncio.gather(first, *queued)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert order == ["first", "second", "third"]
+    assert rejected.retry_after >= 1
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from executor.approximate import execute_plan_approximate
+from executor.executor import execute_plan
+
+
+def _sales(rows=200_000):
+    rng = np.random.default_rng(0)
+    region = rng.choice(["north", "south", "east", "tiny"], rows, p=[0.5, 0.3, 0.1999, 0.0001])
+    return pd.DataFrame({
+        "REGION": pd.Categorical(region),
+        "DATE": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "SALES": rng.gamma(2.0, 50.0, rows),
+    })
+
+
+def _plan(group_by):
+    return {
+        "analysis_type": "aggregation",
+        "filters": [],
+        "group_by": group_by,
+        "metrics": [{"column": "SALES", "operation": "sum"}],
+        "sort": {},
+        "visualization": {"type": "bar"},
+    }
+
+
+def _check_against_exact(df, plan):
+    exact, _, _ = execute_plan(df, plan)
+    approx, _, _ = execute_plan_approximate(df, plan, sample_fraction=0.05)
+
+    merged = exact.merge(approx, on=plan["group_by"], suffixes=("_exact", ""))
+    assert len(merged) == len(exact)
+    assert approx.attrs["approximate"]["sample_rows"] < len(df)
+
+    covered = merged["SALES_exact"].between(merged["SALES_ci_low"], merged["SALES_ci_high"])
+    assert covered.mean() >= 0.8
+
+
+def test_categorical_strata_keep_small_groups():
+    df = _sales()
+    _check_against_exact(df, _plan(["REGION"]))
+
+
+def test_time_buckets_come_from_the_sample_only():
+    df = _sales()
+    plan = {**_plan(["DATE"]), "analysis_type": "trend", "time_grain": "month"}
+    _check_against_exact(df, plan)
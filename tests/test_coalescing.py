@@ -0,0 +1,107 @@
+import asyncio
+import copy
+import time
+
+import pandas as pd
+
+from utils.single_flight import SingleFlight
+
+PLAN = {
+    "analysis_type": "aggregation",
+    "filters": [],
+    "group_by": ["COUNTRY"],
+    "metrics": [{"column": "SALES", "operation": "sum"}],
+    "sort": {},
+    "visualization": {"type": "bar"},
+}
+
+
+def test_identical_concurrent_calls_execute_once():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"rows": 3}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("q", work) for _ in range(10)))
+        other = await flight.do("other", work)
+        return results, other
+
+    results, other = asyncio.run(main())
+    assert len(calls) == 2
+    assert all(r is results[0] for r in results)
+    assert other == {"rows": 3}
+    assert len(flight) == 0
+
+
+def test_failure_reaches_every_waiter():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("q", work) for _ in range(5)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def _dataset(app_main, monkeypatch):
+    planned, executed = [], []
+
+    def generate_plan(columns, question, context=None):
+        planned.append(question)
+        time.sleep(0.05)
+        return copy.deepcopy(PLAN)
+
+    run_plan = app_main.run_plan
+
+    async def counting_run_plan(*args, **kwargs):
+        executed.append(1)
+        return await run_plan(*args, **kwargs)
+
+    monkeypatch.setattr(app_main.planner, "generate_plan", generate_plan)
+    monkeypatch.setattr(app_main, "run_plan", counting_run_plan)
+
+    df = pd.DataFrame({
+        "COUNTRY": ["USA", "France", "USA", "Spain"] * 25,
+        "SALES": [float(i) for i in range(100)],
+    })
+    dataset = app_main.datasets.put(f"coalescing-{time.monotonic_ns()}", df)
+    return dataset, planned, executed
+
+
+def test_concurrent_identical_questions_run_the_pipeline_once(app_main, monkeypatch):
+    dataset, planned, executed = _dataset(app_main, monkeypatch)
+    questions = ["Sales by country?", "sales  by country", "SALES BY COUNTRY"] * 4
+
+    async def main():
+        return await asyncio.gather(
+            *(app_main.run_analysis(dataset, q) for q in questions)
+        )
+
+    results = asyncio.run(main())
+    assert planned == ["Sales by country?"]
+    assert executed == [1]
+    assert all(r is results[0] for r in results)
+
+
+def test_replan_bypasses_the_plan_cache(app_main, monkeypatch):
+    dataset, planned, executed = _dataset(app_main, monkeypatch)
+
+    first = asyncio.run(app_main.run_analysis(dataset, "sales by country"))
+    cached = asyncio.run(app_main.run_analysis(dataset, "sales by country"))
+    assert len(planned) == 1
+    assert "plan" not in cached["timings"]
+
+    replanned = asyncio.run(app_main.run_analysis(dataset, "sales by country", replan=True))
+    assert len(planned) == 2
+    assert "plan" in replanned["timings"]
+    assert replanned["plan_key"] == first["plan_key"]
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from executor.result_cache import compute_aggregate
+from schemas.plan_validator import compile_plan
+from store.dataset_store import DatasetStore, appended_dataset_id
+
+
+def _orders(rows):
+    return pd.DataFrame({
+        "COUNTRY": [["USA", "France", "Spain"][i % 3] for i in range(rows)],
+        "SALES": [float(i) for i in range(rows)],
+    })
+
+
+def _grouped(column_set, operation, filters=()):
+    return compile_plan({
+        "analysis_type": "aggregation",
+        "filters": list(filters),
+        "group_by": ["COUNTRY"],
+        "metrics": [{"column": "SALES", "operation": operation}],
+        "sort": {},
+        "visualization": {"type": "bar"},
+    }, column_set)
+
+
+@pytest.mark.parametrize("operation", ["sum", "count", "min", "max", "mean"])
+def test_appended_partials_match_a_full_recompute(operation):
+    first = _orders(30)
+    # New rows bring a category the encoded column has not seen yet
+    new_rows = pd.DataFrame({
+        "COUNTRY": ["USA", "Japan", "Spain", "Japan"],
+        "SALES": [1000.0, -5.0, 7.5, 3.0],
+    })
+
+    store = DatasetStore(categorical_max_cardinality=1000)
+    original = store.put("upload-hash", first)
+    plans = [
+        _grouped(original.column_set, operation),
+        _grouped(original.column_set, operation, [{"column": "SALES", "operator": ">", "value": 5}]),
+    ]
+    for plan in plans:
+        aggregated, partials = compute_aggregate(original.df, plan.as_dict())
+        original.cache_result(plan, original.version, aggregated, partials)
+
+    summary = store.append(original, appended_dataset_id("upload-hash", "rows-hash"), new_rows)
+    appended = store.get(summary["dataset_id"])
+    recomputed = DatasetStore(categorical_max_cardinality=1000).put(
+        "full", pd.concat([first, new_rows], ignore_index=True)
+    )
+
+    assert summary["updated"] == len(plans) and summary["invalidated"] == 0
+    assert appended.version == original.version + 1
+    for plan in plans:
+        expected, expected_partials = compute_aggregate(recomputed.df, plan.as_dict())
+        entry = appended.results._entries[plan.key]
+
+        pd.testing.assert_frame_equal(
+            entry["partials"].sort_index(), expected_partials.sort_index(),
+            check_dtype=False, check_categorical=False, check_index_type=False
+        )
+        pd.testing.assert_frame_equal(
+            appended.results.get(plan).sort_values("COUNTRY").reset_index(drop=True),
+            expected.sort_values("COUNTRY").reset_index(drop=True),
+            check_dtype=False, check_categorical=False
+        )
+
+
+def test_append_forks_instead_of_changing_the_uploaded_dataset():
+    store = DatasetStore()
+    original = store.put("upload-hash", _orders(30))
+    plan = compile_plan({
+        "analysis_type": "aggregation",
+        "filters": [],
+        "group_by": ["COUNTRY"],
+        "metrics": [{"column": "SALES", "operation": "sum"}],
+        "sort": {},
+        "visualization": {"type": "bar"},
+    }, original.column_set)
+    original.cache_result(plan, original.version, pd.DataFrame({"COUNTRY": ["USA"], "SALES": [1.0]}))
+
+    appended_id = appended_dataset_id("upload-hash", "rows-hash")
+    summary = store.append(original, appended_id, _orders(5))
+
+    assert summary["dataset_id"] == appended_id
+    assert summary["parent_id"] == "upload-hash"
+    assert store.get("upload-hash") is original
+    assert len(original.df) == 30 and original.version == 0
+    assert original.profile["SALES"]["non_null"] == 30
+    assert plan in original.results
+
+    appended = store.get(appended_id)
+    assert len(appended.df) == 35
+    assert appended.profile["SALES"]["non_null"] == 35
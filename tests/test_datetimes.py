@@ -0,0 +1,39 @@
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+from executor.executor import apply_filters
+from ingest.datetimes import parse_datetimes
+
+
+def test_text_columns_that_dateutil_accepts_stay_text():
+    df = pd.DataFrame({
+        "MONTH": ["January", "February", "March", "April"],
+        "DAY": ["Monday", "Tuesday", "Wednesday", "Thursday"],
+        "SIZE": ["1/2", "3/4", "5/8", "7/8"],
+    })
+
+    parsed, report = parse_datetimes(df)
+
+    assert report["datetime_columns"] == []
+    assert parsed["MONTH"].tolist() == df["MONTH"].tolist()
+    assert parsed["SIZE"].tolist() == df["SIZE"].tolist()
+
+
+def test_full_dates_in_mixed_formats_are_parsed():
+    df = pd.DataFrame({
+        "ORDERDATE": ["2/24/2003 0:00", "05-07-2003 00:00", "2003-07-01", "Aug 25, 2003"],
+    })
+
+    parsed, report = parse_datetimes(df)
+
+    assert report["datetime_columns"] == ["ORDERDATE"]
+    assert is_datetime64_any_dtype(parsed["ORDERDATE"])
+    assert parsed["ORDERDATE"].dt.year.eq(2003).all()
+
+
+def test_in_filter_with_date_strings_matches_converted_column():
+    raw = pd.DataFrame({"ORDERDATE": ["2/24/2003 0:00", "5/7/2003 0:00", "2/24/2003 0:00", "7/1/2003 0:00"]})
+    parsed, _ = parse_datetimes(raw)
+    filters = [{"column": "ORDERDATE", "operator": "in", "value": ["2/24/2003 0:00", "2003-07-01"]}]
+
+    assert len(apply_filters(parsed, filters)) == 3
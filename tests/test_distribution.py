@@ -0,0 +1,15 @@
+import pandas as pd
+
+from executor.executor import distribution_result
+
+
+def test_filtered_away_categories_are_not_counted():
+    df = pd.DataFrame({"STATUS": pd.Categorical(["Shipped", "Shipped", "Disputed"],
+                                                categories=["Cancelled", "Disputed", "Shipped"])})
+    plan = {"analysis_type": "distribution", "visualization": {"type": "histogram", "x": "STATUS"}}
+
+    result_df = distribution_result(df, plan)
+
+    assert result_df["STATUS"].tolist() == ["Shipped", "Disputed"]
+    assert result_df["count"].tolist() == [2, 1]
+    assert result_df.attrs["statistics"]["distinct"] == 2
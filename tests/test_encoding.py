@@ -0,0 +1,27 @@
+import pandas as pd
+
+from executor.executor import execute_plan
+from ingest.encoding import encode_categoricals
+
+
+def test_min_max_of_encoded_strings_match_the_raw_strings():
+    raw = pd.DataFrame({
+        "COUNTRY": ["USA", "USA", "France", "France"] * 5,
+        "CUSTOMERNAME": ["Mini Gifts", "Land of Toys", "Atelier", "Rovelli"] * 5,
+    })
+    encoded, report = encode_categoricals(raw)
+    assert "CUSTOMERNAME" in report["encoded_columns"]
+
+    for operation in ("min", "max"):
+        plan = {
+            "analysis_type": "aggregation",
+            "filters": [],
+            "group_by": ["COUNTRY"],
+            "metrics": [{"column": "CUSTOMERNAME", "operation": operation}],
+            "sort": {},
+            "visualization": {"type": "bar"},
+        }
+        expected, _, _ = execute_plan(raw, plan)
+        result, _, _ = execute_plan(encoded, plan)
+
+        assert result["CUSTOMERNAME"].tolist() == expected["CUSTOMERNAME"].tolist()
@@ -0,0 +1,17 @@
+import time
+
+from store.job_store import JobStore
+
+
+def test_finished_jobs_expire_while_the_server_runs():
+    store = JobStore(":memory:", retention_seconds=0.1)
+    store.create("old", "interactive", "q")
+    store.complete("old", {"rows": 1})
+    time.sleep(0.2)
+
+    store.create("new", "interactive", "q")
+    assert store.get("old") is not None
+
+    store.fail("new", "boom")
+    assert store.get("old") is None
+    assert store.get("new")["status"] == "failed"
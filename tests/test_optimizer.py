@@ -0,0 +1,149 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from executor.executor import execute_plan, finalize_result
+from executor.result_cache import compute_aggregate
+from schemas.plan_validator import compile_plan
+from store.dataset_store import Dataset
+
+DIMENSIONS = ["COUNTRY", "PRODUCTLINE", "YEAR_ID", "DEALSIZE"]
+MEASURES = ["SALES", "QUANTITYORDERED"]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = np.random.default_rng(7)
+    rows = 3000
+    df = pd.DataFrame({
+        "COUNTRY": rng.choice(["USA", "France", "Spain", "Japan", "Italy"], rows),
+        "PRODUCTLINE": rng.choice(["Classic Cars", "Ships", "Trains", "Planes"], rows),
+        "YEAR_ID": rng.choice([2003, 2004, 2005], rows),
+        "DEALSIZE": rng.choice(["Small", "Medium", "Large"], rows),
+        "CUSTOMERNAME": [f"Customer {i}" for i in rng.integers(0, 400, rows)],
+        "SALES": rng.gamma(2.0, 1500.0, rows).round(2),
+        "QUANTITYORDERED": rng.integers(1, 100, rows),
+    })
+    return Dataset("orders", df, cube_max_cardinality=50, categorical_max_cardinality=1000)
+
+
+def _plan(**parts):
+    plan = {
+        "analysis_type": "aggregation",
+        "filters": [],
+        "group_by": [],
+        "metrics": [],
+        "sort": {},
+        "visualization": {"type": "bar"},
+    }
+    plan.update(parts)
+    return plan
+
+
+def _optimized(dataset, compiled):
+    """Result along the optimizer's physical plan, the way /analyze runs it."""
+    physical = dataset.optimize(compiled)
+    plan = compiled.as_dict()
+
+    aggregated = dataset.results.get(compiled) if physical["strategy"] == "cached" else None
+    if aggregated is None:
+        aggregated, _ = compute_aggregate(dataset.df, plan, cube=dataset.cube, physical=physical)
+
+    result_df, _, _ = finalize_result(aggregated, plan)
+    return physical["strategy"], result_df
+
+
+def _assert_same_result(dataset, compiled, result_df):
+    expected, _, _ = execute_plan(dataset.df, compiled.as_dict())
+    pd.testing.assert_frame_equal(
+        result_df.reset_index(drop=True), expected.reset_index(drop=True),
+        check_dtype=False, check_categorical=False, rtol=1e-9
+    )
+
+
+STRATEGY_PLANS = {
+    "empty": _plan(
+        filters=[{"column": "COUNTRY", "operator": "==", "value": "Atlantis"}],
+        group_by=["PRODUCTLINE"],
+        metrics=[{"column": "SALES", "operation": "sum"}],
+    ),
+    "cube": _plan(
+        filters=[{"column": "YEAR_ID", "operator": "==", "value": 2004}],
+        group_by=["COUNTRY"],
+        metrics=[{"column": "SALES", "operation": "mean"}],
+    ),
+    "topn": _plan(
+        analysis_type="comparison",
+        sort={"by": "SALES", "order": "desc"},
+        visualization={"type": "bar", "top_n": 5},
+    ),
+    "scan": _plan(
+        group_by=["CUSTOMERNAME"],
+        metrics=[{"column": "QUANTITYORDERED", "operation": "max"}],
+        sort={"by": "QUANTITYORDERED", "order": "desc"},
+    ),
+}
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGY_PLANS))
+def test_strategy_is_chosen_and_matches_a_plain_scan(dataset, strategy):
+    compiled = compile_plan(STRATEGY_PLANS[strategy], dataset.column_set)
+
+    chosen, result_df = _optimized(dataset, compiled)
+
+    assert chosen == strategy
+    _assert_same_result(dataset, compiled, result_df)
+
+
+def test_cached_strategy_matches_a_plain_scan(dataset):
+    compiled = compile_plan(_plan(
+        group_by=["CUSTOMERNAME"],
+        metrics=[{"column": "SALES", "operation": "sum"}],
+    ), dataset.column_set)
+    aggregated, partials = compute_aggregate(dataset.df, compiled.as_dict(), cube=dataset.cube)
+    dataset.cache_result(compiled, dataset.version, aggregated, partials)
+
+    chosen, result_df = _optimized(dataset, compiled)
+
+    assert chosen == "cached"
+    _assert_same_result(dataset, compiled, result_df)
+
+
+def test_random_plans_match_a_plain_scan(dataset):
+    rng = random.Random(11)
+    seen = set()
+
+    for _ in range(150):
+        group_by = rng.sample(DIMENSIONS, rng.choice([0, 1, 2]))
+        metrics = [
+            {"column": rng.choice(MEASURES), "operation": rng.choice(["sum", "count", "mean", "min", "max"])}
+            for _ in range(rng.choice([1, 2]))
+        ]
+        if not group_by:
+            metrics = [{"column": rng.choice(MEASURES + ["CUSTOMERNAME"]), "operation": "count"}]
+
+        filters = []
+        for _ in range(rng.choice([0, 1, 2])):
+            column = rng.choice(DIMENSIONS)
+            values = [v.item() if hasattr(v, "item") else v for v in dataset.df[column].unique()]
+            operator = rng.choice(["==", "!=", "in", ">="] if column == "YEAR_ID" else ["==", "!=", "in"])
+            value = rng.sample(values, 2) if operator == "in" else rng.choice(values)
+            if rng.random() < 0.1:
+                value = ["Nowhere"] if operator == "in" else 1999 if operator == ">=" else "Nowhere"
+            filters.append({"column": column, "operator": operator, "value": value})
+
+        compiled = compile_plan(_plan(
+            filters=filters,
+            group_by=group_by,
+            metrics=metrics,
+            sort={"by": metrics[0]["column"] if group_by else None, "order": rng.choice(["asc", "desc"])},
+            visualization={"type": "bar", "top_n": rng.choice([None, 3])},
+        ), dataset.column_set)
+
+        chosen, result_df = _optimized(dataset, compiled)
+        seen.add(chosen)
+        _assert_same_result(dataset, compiled, result_df)
+
+    assert {"empty", "cube", "scan"} <= seen
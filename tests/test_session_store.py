@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from store.session_store import Session
+
+
+def _session():
+    rows = pd.DataFrame({
+        "COUNTRY": ["USA", "USA", "France"],
+        "PRODUCTLINE": ["Cars", "Ships", "Cars"],
+        "SALES": [10.0, 20.0, 5.0],
+    })
+    dataset = SimpleNamespace(df=rows, version=0)
+
+    session = Session("s", "d")
+    previous = {
+        "filters": [],
+        "group_by": ["COUNTRY"],
+        "metrics": [{"column": "SALES", "operation": "sum"}],
+        "visualization": {"type": "bar", "x": "COUNTRY", "y": "SALES"},
+    }
+    result = pd.DataFrame({"COUNTRY": ["France", "USA"], "SALES": [5.0, 30.0]})
+    session.record("sales by country", previous, result, rows, None, 0)
+    return session, dataset
+
+
+def _follow_up(operation, **viz):
+    return {
+        "refine": "result",
+        "filters": [{"column": "SALES", "operator": ">", "value": 1}],
+        "group_by": [],
+        "metrics": [{"column": "SALES", "operation": operation}],
+        "visualization": {"type": "bar", "x": "COUNTRY", "y": "SALES", **viz},
+        "sort": {"by": "SALES", "order": "desc"},
+    }
+
+
+def test_result_is_reused_when_re_aggregation_is_exact():
+    session, dataset = _session()
+    base, refined = session.base_for(_follow_up("sum"), dataset)
+    assert refined == "result"
+    assert base is session.result_df
+
+
+def test_mean_or_count_of_previous_sums_uses_the_rows():
+    session, dataset = _session()
+    for operation in ("mean", "count"):
+        base, refined = session.base_for(_follow_up(operation), dataset)
+        assert refined is None
+        assert base is dataset.df
+
+
+def test_plot_column_missing_from_result_uses_the_rows():
+    session, dataset = _session()
+    base, refined = session.base_for(_follow_up("sum", color="PRODUCTLINE"), dataset)
+    assert refined is None
+    assert base is dataset.df